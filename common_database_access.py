@@ -1,8 +1,18 @@
 """Access to SQLite database class"""
 import sqlite3
+import threading
+import inspect
+import json
+import math
+import time
+
+import os
+
+from contextlib import contextmanager
 
 from os import path
 from sqlite3 import Error
+from urllib.request import pathname2url
 from rich.pretty import pprint
 
 
@@ -18,43 +28,378 @@ class DatabaseFileDoesNotExist(Exception):
         super().__init__(message.format(db_path))
 
 
+ASSET_COLUMNS = (
+    "name",
+    "url",
+    "category",
+    "preview_image",
+    "details_image",
+    "variant_1_image",
+    "variant_2_image",
+    "variant_3_image",
+    "have_preview_image_changed",
+    "have_details_image_changed",
+    "have_variant_1_image_changed",
+    "have_variant_2_image_changed",
+    "have_variant_3_image_changed",
+    "last_change_date",
+    "need_to_check",
+    "format_sbsar",
+    "format_sbs",
+    "format_exr",
+    "format_fbx",
+    "format_glb",
+    "format_mdl",
+    "have_format_sbsar",
+    "have_format_sbs",
+    "have_format_exr",
+    "have_format_fbx",
+    "have_format_glb",
+    "have_format_mdl",
+    "formats_offered",
+    "formats_owned",
+    "removed",
+)
+
+ASSET_FORMATS = ("sbsar", "sbs", "exr", "fbx", "glb", "mdl")
+
+
+def format_mask(asset_data, prefix) -> int:
+    """
+    Packs boolean format columns into bitmask, bit order is ASSET_FORMATS
+    :param {} asset_data: data of the asset
+    :param str prefix: "format_" for offered formats or "have_format_" for owned formats
+    :return: bitmask of the formats
+    """
+    mask = 0
+    for bit, asset_format in enumerate(ASSET_FORMATS):
+        if asset_data[prefix + asset_format]:
+            mask = mask | (1 << bit)
+    return mask
+
+
+def format_names(mask) -> []:
+    """
+    Unpacks bitmask to the format names
+    :param int mask: bitmask of the formats
+    :return: list of format names, like ["sbsar", "exr"]
+    """
+    return [
+        asset_format
+        for bit, asset_format in enumerate(ASSET_FORMATS)
+        if mask & (1 << bit)
+    ]
+
+
+CATALOG_TABLES = (
+    "asset_type",
+    "category",
+    "asset",
+    "scan",
+    "asset_change",
+    "scan_category",
+    "scan_category_card",
+    "scan_report",
+)
+
+# states of the category in the checkpointed category scan:
+# "in_progress" - being read, "collected" - cards are stored in scan_category_card,
+# "done" - cards are applied to the catalog
+SCAN_CATEGORY_STATES = ("pending", "in_progress", "collected", "done", "failed")
+
+NAME_KEY_SQL = "trim(replace(name, '_', ' '))"
+
+
+def normalize_asset_name(name) -> str:
+    """
+    Same normalisation as name_key column: underscores become spaces, outer spaces are removed.
+    Comparison with name_key is case-insensitive
+    :param str name: asset name or file name without extension
+    :return: normalised name
+    """
+    return name.replace("_", " ").strip(" ")
+
+
+def _check_alias(alias) -> None:
+    """Schema names are put into SQL text, so only plain identifiers are allowed"""
+    if not alias.isidentifier():
+        raise ValueError(f"Wrong database alias '{alias}'")
+
+
+def _format_mask_sql(prefix) -> str:
+    """SQL expression that packs boolean format columns into bitmask"""
+    return " | ".join(
+        f"(CASE WHEN {prefix}{asset_format} THEN {1 << bit} ELSE 0 END)"
+        for bit, asset_format in enumerate(ASSET_FORMATS)
+    )
+
+
+class AssetRecord(dict):
+    """Asset row from the database, that remembers values it was loaded with,
+    so only changed fields are written back by update_asset"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.original = dict(self)
+
+    def changed_fields(self) -> []:
+        """
+        Fields that differ from the loaded values
+        :return: list of changed field names
+        """
+        return [
+            key
+            for key, value in self.items()
+            if key not in self.original or self.original[key] != value
+        ]
+
+    def mark_clean(self) -> None:
+        """Current values become the loaded values, after they are saved"""
+        self.original = dict(self)
+
+
+class QueryProfiler:
+    """Collects call count, latency and returned rows of the CommonDatabaseAccess methods,
+    and count of SQL statements and commits from the connection trace callback"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = {}
+        self.rows = {}
+        self.statements = 0
+        self.commits = 0
+
+    def reset(self) -> None:
+        """Starts new measurement"""
+        with self.lock:
+            self.durations = {}
+            self.rows = {}
+            self.statements = 0
+            self.commits = 0
+
+    def trace(self, statement) -> None:
+        """Trace callback of the sqlite3 connection"""
+        with self.lock:
+            self.statements = self.statements + 1
+            if statement.strip().upper() == "COMMIT":
+                self.commits = self.commits + 1
+
+    def record(self, name, duration, rows) -> None:
+        """Stores one call of the method"""
+        with self.lock:
+            self.durations.setdefault(name, []).append(duration)
+            self.rows[name] = self.rows.get(name, 0) + rows
+
+    def wrap(self, name, method):
+        """
+        Wraps method to measure it. Generators are measured until they are exhausted
+        :param str name: name of the method in the summary
+        :param method: bound method of CommonDatabaseAccess
+        :return: measured method
+        """
+
+        def measured_generator(generator, started):
+            rows = 0
+            spent = time.perf_counter() - started
+            try:
+                while True:
+                    resumed = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        spent = spent + time.perf_counter() - resumed
+                        return
+                    spent = spent + time.perf_counter() - resumed
+                    rows = rows + 1
+                    yield item
+            finally:
+                self.record(name, spent, rows)
+
+        def measured(*args, **kwargs):
+            started = time.perf_counter()
+            result = method(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return measured_generator(result, started)
+            self.record(
+                name,
+                time.perf_counter() - started,
+                len(result) if isinstance(result, list) else 0,
+            )
+            return result
+
+        return measured
+
+    def summary(self) -> {}:
+        """
+        Summary of the measurement, methods are sorted by total time
+        :return: {"statements", "commits", "methods": {name: {"count", "total_ms", "p95_ms", "rows"}}}
+        """
+        with self.lock:
+            methods = {}
+            for name, durations in sorted(
+                self.durations.items(), key=lambda item: -sum(item[1])
+            ):
+                ordered = sorted(durations)
+                methods[name] = {
+                    "count": len(ordered),
+                    "total_ms": round(sum(ordered) * 1000, 3),
+                    "p95_ms": round(
+                        ordered[max(math.ceil(len(ordered) * 0.95) - 1, 0)] * 1000, 3
+                    ),
+                    "rows": self.rows.get(name, 0),
+                }
+            return {
+                "statements": self.statements,
+                "commits": self.commits,
+                "methods": methods,
+            }
+
+
 class CommonDatabaseAccess:
     """Class to access SQLite database"""
 
-    def __init__(self, db_path, force):
+    def __init__(
+        self, db_path, force, wal=False, profile=False, read_only=False, immutable=False
+    ):
         """
         Checking if we have our db file
         :param str db_path: path to the database file
         :param bool force: if database file do not exist and force is True, it will be created
+        :param bool wal: use WAL journal with tuned pragmas, so readers do not block the writer
+        :param bool profile: measure all database methods, see write_profile
+        :param bool read_only: open existing database read only with large mmap, for reports.
+            Database is not upgraded, so it must be opened read-write once before
+        :param bool immutable: read only database is a snapshot copy, that nobody changes,
+            so SQLite skips all locking
         """
 
-        self.conn = None
+        self.db_path = db_path
+        self.wal = wal
+        self.read_only = read_only or immutable
+        self.immutable = immutable
+        self.profiler = None
+        if profile:
+            self.profiler = QueryProfiler()
+            for name, member in inspect.getmembers(type(self), inspect.isfunction):
+                if not name.startswith("_") and name not in (
+                    "batch_write",
+                    "close",
+                    "connect_to_database",
+                    "write_profile",
+                ):
+                    setattr(self, name, self.profiler.wrap(name, getattr(self, name)))
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         if not path.exists(db_path):
-            if force:
+            if force and not self.read_only:
                 self.connect_to_database(db_path)
                 self.create_database()
+                self.upgrade_database()
             else:
                 raise DatabaseFileDoesNotExist(db_path)
+        elif self.read_only:
+            self.connect_to_database(db_path)
         else:
             self.connect_to_database(db_path)
+            self.upgrade_database()
 
     def __del__(self) -> None:
         """ "Need to close database connection when we are fully done"""
-        if self.conn:
-            self.conn.close()
-
-    def connect_to_database(self, db_path) -> None:
-        """Creates connection to the database"""
+        self.close()
+
+    @property
+    def conn(self):
+        """Connection of the current thread, every thread gets its own connection"""
+        connection = getattr(self._local, "conn", None)
+        if connection is None:
+            connection = self.connect_to_database(self.db_path)
+        return connection
+
+    def connect_to_database(self, db_path):
+        """Creates connection to the database for the current thread"""
+        connection = None
+        # always opened by URI, so read only URIs of the attached databases are honoured too
+        db_path = "file:" + pathname2url(path.abspath(db_path))
+        if self.read_only:
+            db_path = db_path + "?mode=ro"
+            if self.immutable:
+                db_path = db_path + "&immutable=1"
         try:
-            self.conn = sqlite3.connect(
-                db_path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+            connection = sqlite3.connect(
+                db_path,
+                uri=True,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                timeout=30,
+                check_same_thread=False,  # only used by own thread, but closed by any
             )
-            self.conn.row_factory = sqlite3.Row
+            connection.row_factory = sqlite3.Row
+            if self.profiler is not None:
+                connection.set_trace_callback(self.profiler.trace)
+            if self.read_only:
+                connection.execute("PRAGMA query_only=ON")
+                connection.execute("PRAGMA mmap_size=1073741824")  # 1 GB
+            elif self.wal:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.execute("PRAGMA cache_size=-65536")  # 64 MB
+                connection.execute("PRAGMA mmap_size=268435456")  # 256 MB
+            self._local.conn = connection
+            with self._connections_lock:
+                self._connections.append(connection)
         except Error as _e:
             pprint(_e)
-        # finally:
-        #     if self.conn:
-        #         self.conn.close()
+        return connection
+
+    def close(self) -> None:
+        """Closes connections of all threads"""
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def commit(self) -> None:
+        """Commits changes of the current thread, inside batch_write commit is postponed"""
+        if getattr(self._local, "batch_depth", 0) == 0:
+            self.conn.commit()
+
+    @contextmanager
+    def batch_write(self):
+        """Groups writes of the current thread into one transaction,
+        that is committed at the end of the block or rolled back on error.
+        Blocks can be nested, only the outer block commits
+
+        with database.batch_write():
+            for asset in assets:
+                database.update_asset(asset)
+        """
+        self._local.batch_depth = getattr(self._local, "batch_depth", 0) + 1
+        try:
+            yield self
+        except BaseException:
+            self._local.batch_depth -= 1
+            if self._local.batch_depth == 0:
+                self.conn.rollback()
+            raise
+        self._local.batch_depth -= 1
+        if self._local.batch_depth == 0:
+            self.conn.commit()
+
+    def write_profile(self, file_path, action) -> None:
+        """Appends profile summary of the finished action as JSON line and starts new measurement.
+        Does nothing if database was opened without profile
+
+        :param str file_path: path to the JSON lines file
+        :param str action: name of the finished action
+        """
+        if self.profiler is None:
+            return
+        summary = {"action": action, "finished": time.strftime("%Y-%m-%d %H:%M:%S")}
+        summary.update(self.profiler.summary())
+        with open(file_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(summary) + "\n")
+        self.profiler.reset()
 
     def create_table(self, create_table_sql) -> None:
         """create a table from the create_table_sql statement
@@ -83,7 +428,7 @@ class CommonDatabaseAccess:
                                             url text NOT NULL,
                                             FOREIGN KEY (asset_type) REFERENCES asset_type (id)
                                         ); """
-        sql_create_asset_table = """ CREATE TABLE IF NOT EXISTS asset (
+        sql_create_asset_table = f""" CREATE TABLE IF NOT EXISTS asset (
                                             id integer PRIMARY KEY,
                                             category integer NOT NULL, 
                                             name text NOT NULL,
@@ -112,11 +457,110 @@ class CommonDatabaseAccess:
                                             have_format_fbx bool,
                                             have_format_glb bool,
                                             have_format_mdl bool,
+                                            formats_offered integer NOT NULL DEFAULT 0,
+                                            formats_owned integer NOT NULL DEFAULT 0,
+                                            removed bool NOT NULL DEFAULT 0,
+                                            name_key text COLLATE NOCASE
+                                                GENERATED ALWAYS AS ({NAME_KEY_SQL}) VIRTUAL,
                                             FOREIGN KEY (category) REFERENCES category (id)
                                         );"""
+        sql_create_scan_table = """ CREATE TABLE IF NOT EXISTS scan (
+                                            id integer PRIMARY KEY,
+                                            started timestamp NOT NULL,
+                                            finished timestamp,
+                                            incremental bool NOT NULL DEFAULT 0
+                                        ); """
+        sql_create_asset_change_table = """ CREATE TABLE IF NOT EXISTS asset_change (
+                                            id integer PRIMARY KEY,
+                                            scan integer NOT NULL,
+                                            asset integer NOT NULL,
+                                            field text NOT NULL,
+                                            old_value,
+                                            new_value,
+                                            change_date timestamp NOT NULL,
+                                            FOREIGN KEY (scan) REFERENCES scan (id),
+                                            FOREIGN KEY (asset) REFERENCES asset (id)
+                                        ); """
         self.create_table(sql_create_asset_type_table)
         self.create_table(sql_create_category_table)
         self.create_table(sql_create_asset_table)
+        sql_create_scan_category_table = """ CREATE TABLE IF NOT EXISTS scan_category (
+                                            scan integer NOT NULL,
+                                            category integer NOT NULL,
+                                            state text NOT NULL DEFAULT 'pending',
+                                            error text,
+                                            started timestamp,
+                                            finished timestamp,
+                                            PRIMARY KEY (scan, category),
+                                            FOREIGN KEY (scan) REFERENCES scan (id),
+                                            FOREIGN KEY (category) REFERENCES category (id)
+                                        ); """
+        sql_create_scan_category_card_table = """ CREATE TABLE IF NOT EXISTS scan_category_card (
+                                            scan integer NOT NULL,
+                                            category integer NOT NULL,
+                                            position integer NOT NULL,
+                                            url text NOT NULL,
+                                            preview_image text NOT NULL,
+                                            name text NOT NULL,
+                                            formats text NOT NULL,
+                                            need_update bool NOT NULL,
+                                            PRIMARY KEY (scan, category, position),
+                                            FOREIGN KEY (scan, category)
+                                             REFERENCES scan_category (scan, category)
+                                        ); """
+        sql_create_scan_report_table = """ CREATE TABLE IF NOT EXISTS scan_report (
+                                            id integer PRIMARY KEY,
+                                            scan integer NOT NULL,
+                                            section text NOT NULL,
+                                            entry text NOT NULL,
+                                            FOREIGN KEY (scan) REFERENCES scan (id)
+                                        ); """
+        self.create_table(sql_create_scan_table)
+        self.create_table(sql_create_asset_change_table)
+        self.create_table(sql_create_scan_category_table)
+        self.create_table(sql_create_scan_category_card_table)
+        self.create_table(sql_create_scan_report_table)
+
+    def upgrade_database(self) -> None:
+        """Adds tables, columns and indexes introduced after database was created"""
+        self.create_database()
+        _c = self.conn.cursor()
+        _c.execute("PRAGMA table_xinfo(asset)")
+        columns = [row["name"] for row in _c.fetchall()]
+        if "formats_offered" not in columns:
+            _c.execute(
+                "ALTER TABLE asset ADD COLUMN formats_offered integer NOT NULL DEFAULT 0"
+            )
+            _c.execute(
+                "ALTER TABLE asset ADD COLUMN formats_owned integer NOT NULL DEFAULT 0"
+            )
+            _c.execute(
+                f"""UPDATE asset SET formats_offered = {_format_mask_sql("format_")},
+                 formats_owned = {_format_mask_sql("have_format_")}"""
+            )
+        if "removed" not in columns:
+            _c.execute("ALTER TABLE asset ADD COLUMN removed bool NOT NULL DEFAULT 0")
+        if "name_key" not in columns:
+            _c.execute(
+                f"""ALTER TABLE asset ADD COLUMN name_key text COLLATE NOCASE
+                 GENERATED ALWAYS AS ({NAME_KEY_SQL}) VIRTUAL"""
+            )
+        _c.execute("PRAGMA table_xinfo(scan)")
+        if "incremental" not in [row["name"] for row in _c.fetchall()]:
+            _c.execute(
+                "ALTER TABLE scan ADD COLUMN incremental bool NOT NULL DEFAULT 0"
+            )
+        _c.execute("CREATE INDEX IF NOT EXISTS asset_name_key ON asset (name_key)")
+        _c.execute(
+            "CREATE INDEX IF NOT EXISTS asset_change_scan ON asset_change (scan)"
+        )
+        _c.execute(
+            "CREATE INDEX IF NOT EXISTS asset_change_asset ON asset_change (asset, scan)"
+        )
+        _c.execute(
+            "CREATE INDEX IF NOT EXISTS scan_report_scan ON scan_report (scan)"
+        )
+        self.conn.commit()
 
     def set_new_asset_type(self, name, url) -> int:
         """Creates new entry with given asset type.
@@ -129,7 +573,7 @@ class CommonDatabaseAccess:
         sql = """INSERT INTO asset_type (name, url) VALUES(?, ?)"""
         _c = self.conn.cursor()
         _c.execute(sql, (name, url))
-        self.conn.commit()
+        self.commit()
         return _c.lastrowid
 
     def update_asset_type(self, asset_id, name, url) -> None:
@@ -142,7 +586,7 @@ class CommonDatabaseAccess:
         sql = """UPDATE asset_type SET name = ?, url = ? WHERE id = ?"""
         _c = self.conn.cursor()
         _c.execute(sql, (name, url, asset_id))
-        self.conn.commit()
+        self.commit()
 
     def get_asset_type_by_name(self, name) -> []:
         """Database query for the asset type
@@ -193,7 +637,7 @@ class CommonDatabaseAccess:
         sql = """INSERT INTO category (name, url, asset_type) VALUES(?, ?, ?)"""
         _c = self.conn.cursor()
         _c.execute(sql, (name, url, asset_type_id))
-        self.conn.commit()
+        self.commit()
         return _c.lastrowid
 
     def update_category(self, category_id, name, url, asset_type_id) -> None:
@@ -207,7 +651,7 @@ class CommonDatabaseAccess:
         sql = """UPDATE category SET name = ?, url = ?, asset_type = ? WHERE id = ?"""
         _c = self.conn.cursor()
         _c.execute(sql, (name, url, asset_type_id, category_id))
-        self.conn.commit()
+        self.commit()
 
     def get_category_by_name_and_asset_type_id(self, name, asset_type_id) -> []:
         """Database query for the category by name and asset type
@@ -272,103 +716,93 @@ class CommonDatabaseAccess:
     ) -> int:
         """Creates new entry with given asset.
         Do not check for the duplicates, so be careful.
+        Format bitmasks are computed from the format columns.
 
-        :param bool have_format_mdl: does local mdl exist
+        :param {} asset_data: data of the asset
         :return:  id of the new asset entry
         """
-        sql = """INSERT INTO asset (name, url, category, preview_image,
-         details_image, variant_1_image, variant_2_image, variant_3_image,
-         have_preview_image_changed, have_details_image_changed, have_variant_1_image_changed,
-         have_variant_2_image_changed, have_variant_3_image_changed, last_change_date, 
-         need_to_check, format_sbsar, format_sbs, format_exr, format_fbx, 
-         format_glb, format_mdl, have_format_sbsar, have_format_sbs, have_format_exr, 
-         have_format_fbx, have_format_glb, have_format_mdl) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-          ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
-        _c = self.conn.cursor()
-        _c.execute(
-            sql,
-            (
-                asset_data["name"],
-                asset_data["url"],
-                asset_data["category"],
-                asset_data["preview_image"],
-                asset_data["details_image"],
-                asset_data["variant_1_image"],
-                asset_data["variant_2_image"],
-                asset_data["variant_3_image"],
-                asset_data["have_preview_image_changed"],
-                asset_data["have_details_image_changed"],
-                asset_data["have_variant_1_image_changed"],
-                asset_data["have_variant_2_image_changed"],
-                asset_data["have_variant_3_image_changed"],
-                asset_data["last_change_date"],
-                asset_data["need_to_check"],
-                asset_data["format_sbsar"],
-                asset_data["format_sbs"],
-                asset_data["format_exr"],
-                asset_data["format_fbx"],
-                asset_data["format_glb"],
-                asset_data["format_mdl"],
-                asset_data["have_format_sbsar"],
-                asset_data["have_format_sbs"],
-                asset_data["have_format_exr"],
-                asset_data["have_format_fbx"],
-                asset_data["have_format_glb"],
-                asset_data["have_format_mdl"],
-            ),
+        values = dict(asset_data)
+        values.setdefault("removed", False)
+        values["formats_offered"] = format_mask(asset_data, "format_")
+        values["formats_owned"] = format_mask(asset_data, "have_format_")
+        sql = (
+            "INSERT INTO asset ("
+            + ", ".join(ASSET_COLUMNS)
+            + ") VALUES("
+            + ", ".join("?" for _ in ASSET_COLUMNS)
+            + ")"
         )
-        self.conn.commit()
+        _c = self.conn.cursor()
+        _c.execute(sql, [values[column] for column in ASSET_COLUMNS])
+        self.commit()
         return _c.lastrowid
 
     def update_asset(self, asset_data) -> None:
         """Update asset entry by given id.
         Do not check for the duplicates, so be careful.
+        If asset_data is AssetRecord, only changed columns are written
+        and unchanged records are skipped, plain dict writes the columns it has.
+        Format bitmasks are recomputed from the format columns.
 
         :param []] asset_data: data of the asset
-        :return:  id of the new asset entry
         """
-        sql = """UPDATE asset SET name = ?, url = ?, category = ?, preview_image = ?,
-                 details_image = ?, variant_1_image = ?, variant_2_image = ?, variant_3_image = ?,
-                 have_preview_image_changed = ?, have_details_image_changed = ?, have_variant_1_image_changed = ?,
-                 have_variant_2_image_changed = ?, have_variant_3_image_changed = ?, last_change_date = ?, 
-                 need_to_check = ?, format_sbsar = ?, format_sbs = ?, format_exr = ?, format_fbx = ?, 
-                 format_glb = ?, format_mdl = ?, have_format_sbsar = ?, have_format_sbs = ?, have_format_exr = ?, 
-                 have_format_fbx = ?, have_format_glb = ?, have_format_mdl = ? WHERE id = ?"""
+        self._write_asset_updates([asset_data])
+
+    def update_assets(self, assets_data) -> None:
+        """Updates many assets at once, same as update_asset for every asset.
+        Assets with the same changed columns are written by one executemany
+
+        :param [] assets_data: data of the assets
+        """
+        self._write_asset_updates(assets_data)
+
+    def _write_asset_updates(self, assets_data) -> None:
+        groups = {}
+        for asset_data in assets_data:
+            asset_data["formats_offered"] = format_mask(asset_data, "format_")
+            asset_data["formats_owned"] = format_mask(asset_data, "have_format_")
+            if isinstance(asset_data, AssetRecord):
+                fields = tuple(
+                    f for f in asset_data.changed_fields() if f in ASSET_COLUMNS
+                )
+            else:
+                # dict made before a column was added, like removed, keeps its stored value
+                fields = tuple(f for f in ASSET_COLUMNS if f in asset_data)
+            if len(fields) > 0:
+                groups.setdefault(fields, []).append(asset_data)
+        if len(groups) == 0:
+            return
         _c = self.conn.cursor()
-        _c.execute(
-            sql,
-            (
-                asset_data["name"],
-                asset_data["url"],
-                asset_data["category"],
-                asset_data["preview_image"],
-                asset_data["details_image"],
-                asset_data["variant_1_image"],
-                asset_data["variant_2_image"],
-                asset_data["variant_3_image"],
-                asset_data["have_preview_image_changed"],
-                asset_data["have_details_image_changed"],
-                asset_data["have_variant_1_image_changed"],
-                asset_data["have_variant_2_image_changed"],
-                asset_data["have_variant_3_image_changed"],
-                asset_data["last_change_date"],
-                asset_data["need_to_check"],
-                asset_data["format_sbsar"],
-                asset_data["format_sbs"],
-                asset_data["format_exr"],
-                asset_data["format_fbx"],
-                asset_data["format_glb"],
-                asset_data["format_mdl"],
-                asset_data["have_format_sbsar"],
-                asset_data["have_format_sbs"],
-                asset_data["have_format_exr"],
-                asset_data["have_format_fbx"],
-                asset_data["have_format_glb"],
-                asset_data["have_format_mdl"],
-                asset_data["id"],
-            ),
-        )
-        self.conn.commit()
+        for fields, group in groups.items():
+            sql = (
+                "UPDATE asset SET "
+                + ", ".join(f"{field} = ?" for field in fields)
+                + " WHERE id = ?"
+            )
+            _c.executemany(
+                sql,
+                [
+                    [asset_data[field] for field in fields] + [asset_data["id"]]
+                    for asset_data in group
+                ],
+            )
+        self.commit()
+        for group in groups.values():
+            for asset_data in group:
+                if isinstance(asset_data, AssetRecord):
+                    asset_data.mark_clean()
+
+    def get_all_assets(self) -> []:
+        """Database query for the all assets
+
+        :return: asset data ordered by id
+        """
+        _c = self.conn.cursor()
+        _c.execute("SELECT * FROM asset ORDER BY id")
+
+        rows = _c.fetchall()
+
+        return [AssetRecord(row) for row in rows]
 
     def get_asset_by_name(self, name) -> []:
         """Database query for the asset
@@ -380,7 +814,48 @@ class CommonDatabaseAccess:
 
         rows = _c.fetchall()
 
-        return [dict(row) for row in rows]
+        return [AssetRecord(row) for row in rows]
+
+    def get_assets_by_names(self, names, include_removed=True) -> []:
+        """Database query for many assets by their names in one pass.
+        Names are compared case-insensitive, with underscores treated as spaces
+
+        :param [str] names: names of the assets looked in database
+        :param bool include_removed: also assets marked as removed by the category scan
+        :return: matched assets ordered by id, use their name_key to map them back to names
+        """
+        # names are passed as one JSON parameter, so nothing is written,
+        # also on the read-only handle and inside batch_write
+        _c = self.conn.cursor()
+        _c.execute(
+            """SELECT * FROM asset WHERE name_key IN (SELECT value FROM json_each(?))"""
+            + ("" if include_removed else " AND NOT removed")
+            + " ORDER BY id",
+            (json.dumps([normalize_asset_name(name) for name in names]),),
+        )
+
+        rows = _c.fetchall()
+
+        return [AssetRecord(row) for row in rows]
+
+    def get_assets_by_name_prefix(self, prefix) -> []:
+        """Database query for the assets, which names start with prefix.
+        Case-insensitive, with underscores treated as spaces
+
+        :param str prefix: beginning of the asset name
+        """
+        escaped = (
+            normalize_asset_name(prefix).replace("\\", "\\\\").replace("%", "\\%")
+        )
+        _c = self.conn.cursor()
+        _c.execute(
+            "SELECT * FROM asset WHERE name_key LIKE ? ESCAPE '\\' ORDER BY name_key",
+            (escaped + "%",),
+        )
+
+        rows = _c.fetchall()
+
+        return [AssetRecord(row) for row in rows]
 
     def get_asset_by_id(self, asset_id) -> []:
         """Database query for the asset
@@ -392,7 +867,7 @@ class CommonDatabaseAccess:
 
         rows = _c.fetchall()
 
-        return [dict(row) for row in rows]
+        return [AssetRecord(row) for row in rows]
 
     def get_asset_by_url(self, url) -> []:
         """Database query for the asset
@@ -404,19 +879,23 @@ class CommonDatabaseAccess:
 
         rows = _c.fetchall()
 
-        return [dict(row) for row in rows]
+        return [AssetRecord(row) for row in rows]
 
-    def get_all_assets_by_category(self, category_id) -> []:
+    def get_all_assets_by_category(self, category_id, include_removed=True) -> []:
         """Database query for the asset
 
         :param int category_id: category id of the asset looked in database
+        :param bool include_removed: also assets marked as removed by the category scan
         """
+        sql = "SELECT * FROM asset WHERE category=?"
+        if not include_removed:
+            sql = sql + " AND NOT removed"
         _c = self.conn.cursor()
-        _c.execute("SELECT * FROM asset WHERE category=?", (category_id,))
+        _c.execute(sql, (category_id,))
 
         rows = _c.fetchall()
 
-        return [dict(row) for row in rows]
+        return [AssetRecord(row) for row in rows]
 
     def get_all_assets_for_check(self) -> []:
         """Database query for the asset"""
@@ -425,14 +904,116 @@ class CommonDatabaseAccess:
 
         rows = _c.fetchall()
 
-        return [dict(row) for row in rows]
+        return [AssetRecord(row) for row in rows]
+
+    def get_assets_for_detail_check(self, only_flagged=True) -> []:
+        """Database query for the candidates of the detailed scan, removed assets are skipped,
+        every asset has time of its last recorded change event as "last_event"
+
+        :param bool only_flagged: only assets marked as need_to_check
+        :return: asset data
+        """
+        sql = """SELECT asset.*, (
+         SELECT max(change_date) FROM asset_change WHERE asset_change.asset = asset.id
+         ) AS "last_event [timestamp]" FROM asset WHERE removed = ?"""
+        parameters = (False,)
+        if only_flagged:
+            sql = sql + " AND need_to_check = ?"
+            parameters = (False, True)
+        _c = self.conn.cursor()
+        _c.execute(sql, parameters)
+
+        rows = _c.fetchall()
+
+        return [AssetRecord(row) for row in rows]
+
+    def get_known_asset_cards(self) -> set:
+        """(url, preview_image) of all not removed assets, cards with them are unchanged.
+        Card of the removed asset is not known, so the asset is brought back
+
+        :return: set of (url, preview_image)
+        """
+        _c = self.conn.cursor()
+        _c.execute("SELECT url, preview_image FROM asset WHERE removed = ?", (False,))
 
-    def prepare_asset_type_and_category_dictionary(self) -> {}:
-        """Creates dictionary with asset type and category names and element count
+        return {(row["url"], row["preview_image"]) for row in _c.fetchall()}
 
+    def get_assets_with_path(
+        self,
+        asset_type_id=None,
+        category_id=None,
+        asset_id=None,
+        changed_art=False,
+        need_to_check=False,
+        missing_formats=False,
+        include_removed=False,
+        separator=os.sep,
+    ):
+        """Streams assets joined with their category and asset type in one query.
+        Each record has extra asset_type_id, asset_type_name, category_name,
+        relative_path ('type/category/asset') and formats_missing fields.
+        Records come ordered by asset type, category and asset id.
+
+        :param int asset_type_id: only assets of this asset type
+        :param int category_id: only assets of this category
+        :param int asset_id: only this asset
+        :param bool changed_art: only assets with changed preview, details or variant images
+        :param bool need_to_check: only assets that need detailed scan
+        :param bool missing_formats: only assets with offered, but not owned formats
+        :param bool include_removed: also assets marked as removed by the category scan
+        :param str separator: path separator used in relative_path
+        :return: generator of AssetRecord
+        """
+        sql = """SELECT asset.*, asset_type.id AS asset_type_id,
+         asset_type.name AS asset_type_name, category.name AS category_name,
+         asset_type.name || ? || category.name || ? || asset.name AS relative_path,
+         asset.formats_offered & ~asset.formats_owned AS formats_missing
+         FROM asset
+         JOIN category ON asset.category = category.id
+         JOIN asset_type ON category.asset_type = asset_type.id"""
+        conditions = []
+        params = [separator, separator]
+        if asset_type_id is not None:
+            conditions.append("asset_type.id = ?")
+            params.append(asset_type_id)
+        if category_id is not None:
+            conditions.append("category.id = ?")
+            params.append(category_id)
+        if asset_id is not None:
+            conditions.append("asset.id = ?")
+            params.append(asset_id)
+        if changed_art:
+            conditions.append(
+                """(asset.have_preview_image_changed OR asset.have_details_image_changed
+                 OR asset.have_variant_1_image_changed OR asset.have_variant_2_image_changed
+                 OR asset.have_variant_3_image_changed)"""
+            )
+        if need_to_check:
+            conditions.append("asset.need_to_check")
+        if missing_formats:
+            conditions.append("asset.formats_offered & ~asset.formats_owned != 0")
+        if not include_removed:
+            conditions.append("NOT asset.removed")
+        if len(conditions) > 0:
+            sql = sql + " WHERE " + " AND ".join(conditions)
+        sql = sql + " ORDER BY asset_type.id, category.id, asset.id"
+        _c = self.conn.cursor()
+        _c.execute(sql, params)
+
+        for row in _c:
+            yield AssetRecord(row)
+
+    def prepare_asset_type_and_category_dictionary(self, shards=()) -> {}:
+        """Creates dictionary with asset type and category names and element count,
+        assets marked as removed are not counted
+
+        :param [str] shards: aliases of attached catalogs (see attach_database),
+            assets are counted across main and attached catalogs, once per url
         :rtype: dictionary of the 'asset type' : (elements in type
                                                 {'category': elements in category})
         """
+        if len(shards) > 0:
+            return self._prepare_asset_type_and_category_dictionary_across(shards)
         all_asset_types = self.get_all_asset_types()
         result = {}
         for asset_type in all_asset_types:
@@ -440,12 +1021,162 @@ class CommonDatabaseAccess:
             category_list = {}
             for category in all_categories:
                 category_list[category["name"]] = len(
-                    self.get_all_assets_by_category(category["id"])
+                    self.get_all_assets_by_category(category["id"], include_removed=False)
                 )
             result[asset_type["name"]] = (sum(category_list.values()), category_list)
 
         return result
 
+    def _prepare_asset_type_and_category_dictionary_across(self, shards) -> {}:
+        """Same as prepare_asset_type_and_category_dictionary, but in one query over all catalogs,
+        removed assets are not counted"""
+        selects = []
+        _c = self.conn.cursor()
+        for schema in ("main",) + tuple(shards):
+            _check_alias(schema)
+            # read-only shards of older versions have no removed column
+            _c.execute(f"PRAGMA {schema}.table_xinfo(asset)")
+            not_removed = ""
+            if "removed" in [row["name"] for row in _c.fetchall()]:
+                not_removed = f" AND NOT {schema}.asset.removed"
+            selects.append(
+                f"""SELECT {schema}.asset_type.name AS asset_type_name,
+                 {schema}.category.name AS category_name, {schema}.asset.url AS url
+                 FROM {schema}.category
+                 JOIN {schema}.asset_type ON {schema}.category.asset_type = {schema}.asset_type.id
+                 LEFT JOIN {schema}.asset ON {schema}.asset.category = {schema}.category.id"""
+                + not_removed
+            )
+        _c.execute(
+            "SELECT asset_type_name, category_name, COUNT(DISTINCT url) AS amount FROM ("
+            + " UNION ALL ".join(selects)
+            + ") GROUP BY asset_type_name, category_name ORDER BY asset_type_name, category_name"
+        )
+        result = {}
+        for row in _c.fetchall():
+            category_list = result.setdefault(row["asset_type_name"], (0, {}))[1]
+            category_list[row["category_name"]] = row["amount"]
+        for asset_type_name, (_, category_list) in result.items():
+            result[asset_type_name] = (sum(category_list.values()), category_list)
+
+        return result
+
+    def attach_database(self, db_path, alias, read_only=False) -> None:
+        """Attaches other catalog file to the connection of the current thread,
+        so its tables can be used as alias.table in the queries
+
+        :param str db_path: path to the other database file
+        :param str alias: schema name for the attached database
+        :param bool read_only: attached file is never written
+        :raises ValueError: inside an open transaction, it is not committed here
+        """
+        _check_alias(alias)
+        if not path.exists(db_path):
+            raise DatabaseFileDoesNotExist(db_path)
+        uri = "file:" + pathname2url(path.abspath(db_path))
+        if read_only:
+            uri = uri + "?mode=ro"
+        self._check_no_transaction("attached")
+        self.conn.execute(f"ATTACH DATABASE ? AS {alias}", (uri,))
+
+    def detach_database(self, alias) -> None:
+        """Detaches catalog attached by attach_database
+
+        :param str alias: schema name of the attached database
+        """
+        _check_alias(alias)
+        self._check_no_transaction("detached")
+        self.conn.execute(f"DETACH DATABASE {alias}")
+
+    def _check_no_transaction(self, action) -> None:
+        """SQLite attaches and detaches only outside of a transaction,
+        open transaction of the caller is never committed here"""
+        if self.conn.in_transaction:
+            raise ValueError(f"Catalog can not be {action} inside an open transaction")
+
+    def merge_database(self, db_path) -> {}:
+        """Merges other catalog into this one in one transaction, set-wise with INSERT ... SELECT.
+        Asset types are matched by name, categories by asset type name and name.
+        Assets already present by url, or else by name, are skipped and keep data of this catalog.
+        Scan history is not merged. Other catalog is only read, so it is not upgraded,
+        asset columns it does not have yet get their defaults.
+
+        :param str db_path: path to the other database file
+        :return: {"asset_types": added, "categories": added, "assets": added}
+        """
+        self.attach_database(db_path, "shard", read_only=True)
+        result = {}
+        _c = self.conn.cursor()
+        try:
+            _c.execute("PRAGMA shard.table_xinfo(asset)")
+            shard_columns = {row["name"] for row in _c.fetchall()}
+            _c.execute(
+                """INSERT INTO main.asset_type (name, url)
+                 SELECT name, url FROM shard.asset_type
+                 WHERE id IN (SELECT MIN(id) FROM shard.asset_type GROUP BY name)
+                 AND name NOT IN (SELECT name FROM main.asset_type)
+                 ORDER BY id"""
+            )
+            result["asset_types"] = _c.rowcount
+            _c.execute("DROP TABLE IF EXISTS temp.category_map")
+            _c.execute(
+                """CREATE TEMP TABLE category_map AS
+                 SELECT shard.category.id AS shard_id, shard.category.name AS name,
+                 shard.category.url AS url,
+                 (SELECT MIN(id) FROM main.asset_type WHERE name = shard.asset_type.name)
+                 AS asset_type_id
+                 FROM shard.category
+                 JOIN shard.asset_type ON shard.category.asset_type = shard.asset_type.id"""
+            )
+            _c.execute(
+                """INSERT INTO main.category (asset_type, name, url)
+                 SELECT asset_type_id, name, url FROM temp.category_map
+                 WHERE shard_id IN (SELECT MIN(shard_id) FROM temp.category_map
+                                    GROUP BY asset_type_id, name)
+                 AND NOT EXISTS (SELECT 1 FROM main.category
+                                 WHERE main.category.asset_type = temp.category_map.asset_type_id
+                                 AND main.category.name = temp.category_map.name)
+                 ORDER BY shard_id"""
+            )
+            result["categories"] = _c.rowcount
+            columns = []
+            values = []
+            for column in ASSET_COLUMNS:
+                if column == "category":
+                    continue
+                if column in shard_columns:
+                    columns.append(column)
+                    values.append("shard.asset." + column)
+                elif column == "formats_offered":
+                    columns.append(column)
+                    values.append(_format_mask_sql("shard.asset.format_"))
+                elif column == "formats_owned":
+                    columns.append(column)
+                    values.append(_format_mask_sql("shard.asset.have_format_"))
+            _c.execute(
+                f"""INSERT INTO main.asset (category, {", ".join(columns)})
+                 SELECT (SELECT MIN(id) FROM main.category
+                         WHERE main.category.asset_type = temp.category_map.asset_type_id
+                         AND main.category.name = temp.category_map.name),
+                 {", ".join(values)}
+                 FROM shard.asset
+                 JOIN temp.category_map ON shard.asset.category = temp.category_map.shard_id
+                 WHERE shard.asset.id IN (SELECT MIN(id) FROM shard.asset GROUP BY url)
+                 AND shard.asset.url NOT IN (SELECT url FROM main.asset)
+                 AND shard.asset.name NOT IN (SELECT name FROM main.asset)
+                 ORDER BY shard.asset.id"""
+            )
+            result["assets"] = _c.rowcount
+            _c.execute("DROP TABLE temp.category_map")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self.detach_database("shard")
+
+        return result
+
     def get_asset_type_and_category_name_by_category_id(self, asset_type_id) -> []:
         _c = self.conn.cursor()
         _c.execute("SELECT * FROM category where id=?", (asset_type_id,))
@@ -464,5 +1195,298 @@ class CommonDatabaseAccess:
          have_variant_3_image_changed = ? WHERE id = ?"""
         _c = self.conn.cursor()
         _c.execute(sql, (False, False, False, False, False, asset_id))
-        self.conn.commit()
+        self.commit()
         # return _c.lastrowid
+
+    def set_new_scan(self, started, incremental=False) -> int:
+        """Creates new entry for the catalog scan
+
+        :param datetime started: UTC time of the scan start
+        :param bool incremental: scan processes only new and changed cards
+        :return: id of the new scan entry
+        """
+        sql = """INSERT INTO scan (started, incremental) VALUES(?, ?)"""
+        _c = self.conn.cursor()
+        _c.execute(sql, (started, incremental))
+        self.commit()
+        return _c.lastrowid
+
+    def set_scan_finished(self, scan_id, finished) -> None:
+        """Marks scan as finished
+
+        :param int scan_id: id of the scan
+        :param datetime finished: UTC time of the scan end
+        """
+        sql = """UPDATE scan SET finished = ? WHERE id = ?"""
+        _c = self.conn.cursor()
+        _c.execute(sql, (finished, scan_id))
+        self.commit()
+
+    def set_new_asset_changes(self, changes) -> None:
+        """Appends change events in one transaction.
+        Events are never updated, so they are full history of the catalog
+
+        :param [] changes: list of {"scan", "asset", "field", "old_value", "new_value", "change_date"}
+        """
+        if len(changes) == 0:
+            return
+        sql = """INSERT INTO asset_change (scan, asset, field, old_value, new_value, change_date)
+         VALUES(:scan, :asset, :field, :old_value, :new_value, :change_date)"""
+        _c = self.conn.cursor()
+        _c.executemany(sql, changes)
+        self.commit()
+
+    def get_asset_changes_since_scan(self, scan_id) -> []:
+        """Database query for the change events recorded after given scan
+
+        :param int scan_id: id of the last scan already known to the caller, 0 for everything
+        :return: change events ordered by scan and recording order
+        """
+        _c = self.conn.cursor()
+        _c.execute(
+            "SELECT * FROM asset_change WHERE scan > ? ORDER BY scan, id", (scan_id,)
+        )
+
+        rows = _c.fetchall()
+
+        return [dict(row) for row in rows]
+
+    def get_asset_changes_by_asset(self, asset_id) -> []:
+        """Database query for the change history of one asset
+
+        :param int asset_id: id of the asset
+        :return: change events ordered by scan and recording order
+        """
+        _c = self.conn.cursor()
+        _c.execute(
+            "SELECT * FROM asset_change WHERE asset = ? ORDER BY scan, id", (asset_id,)
+        )
+
+        rows = _c.fetchall()
+
+        return [dict(row) for row in rows]
+
+    def set_scan_categories(self, scan_id, category_ids) -> None:
+        """Adds categories of the scan as pending, so the scan can be resumed
+
+        :param int scan_id: id of the scan
+        :param [int] category_ids: ids of the scanned categories in the scan order
+        """
+        sql = """INSERT OR IGNORE INTO scan_category (scan, category) VALUES(?, ?)"""
+        _c = self.conn.cursor()
+        _c.executemany(sql, [(scan_id, category_id) for category_id in category_ids])
+        self.commit()
+
+    def set_scan_category_state(
+        self, scan_id, category_id, state, changed, error=None
+    ) -> None:
+        """Updates state of the category in the scan
+
+        :param int scan_id: id of the scan
+        :param int category_id: id of the category
+        :param str state: one of SCAN_CATEGORY_STATES
+        :param datetime changed: UTC time of the change, it is start time for "in_progress"
+        :param str error: error of the failed category
+        """
+        if state not in SCAN_CATEGORY_STATES:
+            raise ValueError(f"Unknown scan category state {state}")
+        if state == "in_progress":
+            sql = """UPDATE scan_category SET state = ?, error = ?, started = ?
+             WHERE scan = ? AND category = ?"""
+        else:
+            sql = """UPDATE scan_category SET state = ?, error = ?, finished = ?
+             WHERE scan = ? AND category = ?"""
+        _c = self.conn.cursor()
+        _c.execute(sql, (state, error, changed, scan_id, category_id))
+        self.commit()
+
+    def set_scan_category_cards(self, scan_id, category_id, cards) -> None:
+        """Stores cards read from the category, so they survive until the scan is applied.
+        Cards stored before for the category are replaced
+
+        :param int scan_id: id of the scan
+        :param int category_id: id of the category
+        :param [] cards: {"href", "image", "name", "formats", "need_update"} in the page order
+        """
+        _c = self.conn.cursor()
+        _c.execute(
+            "DELETE FROM scan_category_card WHERE scan = ? AND category = ?",
+            (scan_id, category_id),
+        )
+        _c.executemany(
+            """INSERT INTO scan_category_card
+             (scan, category, position, url, preview_image, name, formats, need_update)
+             VALUES(?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    scan_id,
+                    category_id,
+                    position,
+                    card["href"],
+                    card["image"],
+                    card["name"],
+                    " ".join(card["formats"]),
+                    card["need_update"],
+                )
+                for position, card in enumerate(cards)
+            ],
+        )
+        self.commit()
+
+    def get_scan_category_cards(self, scan_id) -> {}:
+        """Database query for the stored cards of the scan
+
+        :param int scan_id: id of the scan
+        :return: {category id: [cards in the page order]}, see set_scan_category_cards
+        """
+        _c = self.conn.cursor()
+        _c.execute(
+            """SELECT category, url, preview_image, name, formats, need_update
+             FROM scan_category_card WHERE scan = ? ORDER BY category, position""",
+            (scan_id,),
+        )
+        cards = {}
+        for row in _c.fetchall():
+            cards.setdefault(row["category"], []).append(
+                {
+                    "href": row["url"],
+                    "image": row["preview_image"],
+                    "name": row["name"],
+                    "formats": row["formats"].split(" ") if row["formats"] else [],
+                    "need_update": bool(row["need_update"]),
+                }
+            )
+        return cards
+
+    def delete_scan_category_cards(self, scan_id) -> None:
+        """Removes stored cards of the scan, once they are not needed any more
+
+        :param int scan_id: id of the scan
+        """
+        _c = self.conn.cursor()
+        _c.execute("DELETE FROM scan_category_card WHERE scan = ?", (scan_id,))
+        self.commit()
+
+    def get_unfinished_scan(self):
+        """Database query for the last category scan, that has not done categories
+
+        :return: scan data, or None if all scans are finished
+        """
+        _c = self.conn.cursor()
+        _c.execute(
+            """SELECT * FROM scan WHERE finished IS NULL AND EXISTS (
+             SELECT 1 FROM scan_category
+             WHERE scan_category.scan = scan.id AND scan_category.state != 'done')
+             ORDER BY id DESC LIMIT 1"""
+        )
+
+        row = _c.fetchone()
+
+        return dict(row) if row is not None else None
+
+    def get_scan_categories(self, scan_id, states=SCAN_CATEGORY_STATES) -> []:
+        """Database query for the categories of the scan in the given states
+
+        :param int scan_id: id of the scan
+        :param [str] states: wanted states, all by default
+        :return: category data with "state" and "error" of the scan, in the scan order
+        """
+        _c = self.conn.cursor()
+        _c.execute(
+            f"""SELECT category.*, scan_category.state, scan_category.error
+             FROM scan_category JOIN category ON category.id = scan_category.category
+             WHERE scan_category.scan = ?
+             AND scan_category.state IN ({", ".join("?" for _ in states)})
+             ORDER BY scan_category.rowid""",
+            (scan_id, *states),
+        )
+
+        rows = _c.fetchall()
+
+        return [dict(row) for row in rows]
+
+    def set_new_scan_report_entries(self, scan_id, section, entries) -> None:
+        """Appends report entries of the scan
+
+        :param int scan_id: id of the scan
+        :param str section: report section, like "new" or "updated"
+        :param [str] entries: lines of the report
+        """
+        if len(entries) == 0:
+            return
+        sql = """INSERT INTO scan_report (scan, section, entry) VALUES(?, ?, ?)"""
+        _c = self.conn.cursor()
+        _c.executemany(sql, [(scan_id, section, entry) for entry in entries])
+        self.commit()
+
+    def get_scan_report(self, scan_id) -> {}:
+        """Database query for the report entries of the scan
+
+        :param int scan_id: id of the scan
+        :return: {section: [entries in the recording order]}
+        """
+        _c = self.conn.cursor()
+        _c.execute(
+            "SELECT section, entry FROM scan_report WHERE scan = ? ORDER BY id",
+            (scan_id,),
+        )
+        report = {}
+        for row in _c.fetchall():
+            report.setdefault(row["section"], []).append(row["entry"])
+        return report
+
+    def get_table_columns(self, table) -> []:
+        """Stored columns of the catalog table, generated columns are skipped
+
+        :param str table: one of CATALOG_TABLES
+        :return: list of (column name, declared type)
+        """
+        if table not in CATALOG_TABLES:
+            raise ValueError(f"Unknown catalog table '{table}'")
+        _c = self.conn.cursor()
+        _c.execute(f"PRAGMA table_info({table})")
+
+        rows = _c.fetchall()
+
+        return [(row["name"], row["type"].lower()) for row in rows]
+
+    def get_table_batches(self, table, batch_size):
+        """Streams all rows of the catalog table in batches
+
+        :param str table: one of CATALOG_TABLES
+        :param int batch_size: rows in one batch
+        :return: generator of lists of row tuples, in get_table_columns order
+        """
+        columns = [column for column, _ in self.get_table_columns(table)]
+        _c = self.conn.cursor()
+        _c.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid")
+        while True:
+            rows = _c.fetchmany(batch_size)
+            if len(rows) == 0:
+                break
+            yield [tuple(row) for row in rows]
+
+    def bulk_load(self, table_batches) -> int:
+        """Inserts batches of rows in one transaction, nothing is written if any batch fails
+
+        :param table_batches: iterable of (table, columns, list of row tuples)
+        :return: amount of inserted rows
+        """
+        count = 0
+        try:
+            _c = self.conn.cursor()
+            for table, columns, rows in table_batches:
+                if table not in CATALOG_TABLES:
+                    raise ValueError(f"Unknown catalog table '{table}'")
+                _c.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES("
+                    + ", ".join("?" for _ in columns)
+                    + ")",
+                    rows,
+                )
+                count = count + len(rows)
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        return count
@@ -0,0 +1,292 @@
+"""Shared Chrome session for the scraper of https://substance3d.adobe.com/assets/allassets"""
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+START_URL = "https://substance3d.adobe.com/assets/allassets"
+
+# elements, that are rendered only when the page data has been loaded
+ASSET_TYPE_SELECTOR = "a[href*='assetType=']"
+CARD_SELECTOR = "div[class*='source-asset-thumbnail']"
+GALLERY_SELECTOR = "div.sc-hKiEVl.iEOpyR img"
+
+# async: jumps to the bottom and answers with the card count as soon as more cards than known
+# are added to the page, or when nothing comes within the stall timeout
+LOAD_MORE_CARDS_SCRIPT = """
+const selector = arguments[0];
+const knownCount = arguments[1];
+const done = arguments[arguments.length - 1];
+const count = () => document.querySelectorAll(selector).length;
+window.scrollTo(0, document.body.scrollHeight);
+if (count() > knownCount) {
+    done(count());
+    return;
+}
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (count() > knownCount) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(count());
+    }
+});
+timer = setTimeout(() => {
+    observer.disconnect();
+    done(count());
+}, arguments[2]);
+observer.observe(document.body, {childList: true, subtree: true});
+"""
+
+# amount of thumbnails, that were not in the viewport yet, so they are without image link
+MISSING_IMAGES_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0] + " img")).filter(
+    img => !img.src.startsWith("https://")
+).length;
+"""
+
+# true when every thumbnail in the viewport already has its lazy loaded link
+VISIBLE_IMAGES_READY_SCRIPT = """
+const images = document.querySelectorAll(arguments[0] + " img");
+for (const img of images) {
+    const rect = img.getBoundingClientRect();
+    if (rect.bottom > 0 && rect.top < window.innerHeight && !img.src.startsWith("https://")) {
+        return false;
+    }
+}
+return true;
+"""
+
+# fonts and analytics are never needed for scraping, images are blocked by preferences
+BLOCKED_URLS = [
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*demdex.net*",
+    "*omtrdc.net*",
+    "*adobedtm.com*",
+    "*hotjar.com*",
+]
+
+# reads all asset cards of the category page at once, instead of asking the driver element by element.
+# Cards are divs with the same class as the first "source-asset-thumbnail" div,
+# that class is given as argument when it is already known
+CARD_DATA_SCRIPT = """
+let assetClass = arguments[0];
+const cards = [];
+for (const div of document.getElementsByTagName("div")) {
+    const className = div.getAttribute("class") || "";
+    if (assetClass === "" && className.includes("source-asset-thumbnail")) {
+        assetClass = className;
+    }
+    if (assetClass === "" || className !== assetClass) {
+        continue;
+    }
+    const link = div.getElementsByTagName("a")[0];
+    const img = div.getElementsByTagName("img")[0];
+    if (!link || !img) {
+        continue;
+    }
+    // blank lines around block elements are dropped, same as text_lines of the snapshot parser
+    const text = div.innerText.split("\\n").map(line => line.replace(/\\s+/g, " ").trim()).filter(Boolean);
+    cards.push({href: link.href, img: img.src, text: text});
+}
+return {assetClass: assetClass, cards: cards};
+"""
+
+# reads images of the asset page gallery at once,
+# every div of the gallery gives its class and link of its first image
+GALLERY_DATA_SCRIPT = """
+const view = Array.from(document.getElementsByTagName("div")).find(
+    div => div.getAttribute("class") === arguments[0]
+);
+if (!view) {
+    return null;
+}
+const images = [];
+for (const div of view.getElementsByTagName("div")) {
+    const img = div.getElementsByTagName("img")[0];
+    if (img) {
+        images.push({src: img.src, className: div.getAttribute("class") || ""});
+    }
+}
+return images;
+"""
+
+# reads link, class and text of all anchors of the page at once
+ANCHOR_DATA_SCRIPT = """
+return Array.from(document.getElementsByTagName("a"), a => ({
+    href: a.href || "",
+    className: a.getAttribute("class") || "",
+    text: a.innerText.trim(),
+}));
+"""
+
+browser_data = {"driver_path": "", "driver": None, "wait_timeout": 20, "scroll_timeout": 3}
+
+
+def get_driver_path() -> str:
+    """Path to the chromedriver binary, it is resolved only once per program run"""
+    if browser_data["driver_path"] == "":
+        browser_data["driver_path"] = ChromeDriverManager().install()
+    return browser_data["driver_path"]
+
+
+def set_timeouts(wait_timeout=20, scroll_timeout=3) -> None:
+    """
+    Sets how long the browser waits for the page content
+    :param float wait_timeout: seconds to wait for the page to render
+    :param float scroll_timeout: seconds to wait for more content after scrolling
+    """
+    browser_data["wait_timeout"] = wait_timeout
+    browser_data["scroll_timeout"] = scroll_timeout
+
+
+def get_timeouts() -> ():
+    """(wait_timeout, scroll_timeout), so they can be passed to the worker processes"""
+    return browser_data["wait_timeout"], browser_data["scroll_timeout"]
+
+
+def wait_for_page(driver, css_selector="", timeout=None) -> bool:
+    """
+    Waits until document is loaded and element for the css selector is present,
+    returns as soon as page is ready instead of sleeping fixed time
+    :param driver: reference to the Chrome driver
+    :param str css_selector: element, that is present only on rendered page
+    :param float timeout: seconds to wait, wait_timeout if not given
+    :return: False if the page did not get ready in time
+    """
+    wait = WebDriverWait(driver, timeout or browser_data["wait_timeout"], poll_frequency=0.1)
+    try:
+        wait.until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        if css_selector:
+            wait.until(
+                expected_conditions.presence_of_element_located(
+                    (By.CSS_SELECTOR, css_selector)
+                )
+            )
+    except TimeoutException:
+        return False
+    return True
+
+
+def wait_for_visible_images(driver, css_selector, timeout=None) -> bool:
+    """
+    Waits until lazy loaded images in the viewport have their links
+    :param driver: reference to the Chrome driver
+    :param str css_selector: elements, that hold the images
+    :param float timeout: seconds to wait, scroll_timeout if not given
+    :return: False if some image did not get its link in time
+    """
+    try:
+        WebDriverWait(
+            driver, timeout or browser_data["scroll_timeout"], poll_frequency=0.05
+        ).until(lambda d: d.execute_script(VISIBLE_IMAGES_READY_SCRIPT, css_selector))
+    except TimeoutException:
+        return False
+    return True
+
+
+def load_more_cards(driver, css_selector, known_count, timeout=None) -> int:
+    """
+    Jumps to the bottom of the page and waits for more cards than known
+    :param driver: reference to the Chrome driver
+    :param str css_selector: cards, that are counted
+    :param int known_count: amount of cards before the jump
+    :param float timeout: stall timeout in seconds, scroll_timeout if not given
+    :return: amount of cards on the page, same as known_count if nothing came within the timeout
+    """
+    timeout = timeout or browser_data["scroll_timeout"]
+    driver.set_script_timeout(timeout + browser_data["wait_timeout"])
+    return driver.execute_async_script(
+        LOAD_MORE_CARDS_SCRIPT, css_selector, known_count, int(timeout * 1000)
+    )
+
+
+def load_all_cards(driver, css_selector, timeout=None) -> int:
+    """
+    Jumps to the bottom of the page until no new cards are added within the stall timeout
+    :param driver: reference to the Chrome driver
+    :param str css_selector: cards, that are counted
+    :param float timeout: stall timeout in seconds, scroll_timeout if not given
+    :return: amount of cards on the page
+    """
+    count = 0
+    while True:
+        new_count = load_more_cards(driver, css_selector, count, timeout)
+        if new_count <= count:
+            return count
+        count = new_count
+
+
+def count_missing_images(driver, css_selector) -> int:
+    """Amount of images in the cards, that are not loaded yet"""
+    return driver.execute_script(MISSING_IMAGES_SCRIPT, css_selector)
+
+
+def open_start_page(driver) -> None:
+    """Opens all assets page and dismisses cookie popup"""
+    driver.get(START_URL)
+    wait_for_page(driver, ASSET_TYPE_SELECTOR)
+    # waiting to load cookie popup and dismissing it
+    try:
+        WebDriverWait(driver, browser_data["scroll_timeout"]).until(
+            expected_conditions.element_to_be_clickable(
+                (By.ID, "onetrust-accept-btn-handler")
+            )
+        ).click()
+    except TimeoutException:
+        print("no popup found")
+
+
+def start_browser(headless=True, driver_path=""):
+    """
+    Starts new Chrome session, that does not load images, fonts and analytics
+    :param bool headless: run without visible window
+    :param str driver_path: chromedriver binary, resolved by get_driver_path if empty
+    :return: driver with opened start page
+    """
+    options = webdriver.ChromeOptions()
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    options.add_experimental_option(
+        "prefs", {"profile.managed_default_content_settings.images": 2}
+    )
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+    driver = webdriver.Chrome(
+        executable_path=driver_path or get_driver_path(), options=options
+    )
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except WebDriverException:
+        print("resource blocking is not supported")
+    open_start_page(driver)
+    return driver
+
+
+def get_shared_driver(headless=True):
+    """
+    Chrome session shared by all scraper actions, started on first use
+    :param bool headless: run without visible window, used only when session is started
+    :return: driver
+    """
+    if browser_data["driver"] is None:
+        browser_data["driver"] = start_browser(headless)
+    return browser_data["driver"]
+
+
+def close_shared_driver() -> None:
+    """Closes shared Chrome session, if it was started"""
+    if browser_data["driver"] is not None:
+        browser_data["driver"].quit()
+        browser_data["driver"] = None
@@ -0,0 +1,254 @@
+"""
+Catalog tools for the SQLite file made by substance_assets_page_scraper.py
+Export and import of the catalog as batched columnar files for other tools,
+merging of several catalog files and reports across them
+"""
+import os
+import json
+import datetime
+import argparse
+
+from rich import pretty
+from rich.console import Console
+from rich.traceback import install
+
+from common_database_access import CommonDatabaseAccess, CATALOG_TABLES
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # without pyarrow catalog is exported as chunked JSONL
+    pyarrow = None
+
+console = Console()
+pretty.install()
+install()  # this is for tracing project activity
+global_data = {"version": "Beta 1 (19.10.2026)\n"}
+
+
+def _json_default(value):
+    """Dates are written the same way sqlite3 stores them"""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(" ")
+    raise TypeError(f"{type(value)} is not JSON serializable")
+
+
+def _arrow_type(declared_type):
+    """
+    Arrow type for the declared SQLite column type
+    :param str declared_type: type from the CREATE TABLE statement
+    :return: arrow type, or None for untyped columns, that are stored as JSON text
+    """
+    if declared_type in ("integer", "bool"):
+        return pyarrow.int64()
+    if declared_type == "text":
+        return pyarrow.string()
+    if declared_type == "timestamp":
+        return pyarrow.timestamp("us")
+    return None
+
+
+def export_table_jsonl(database, table, file_path, batch_size) -> int:
+    """
+    Writes table as JSONL, every line is one batch in columnar form
+    {"columns": [names], "data": [[values of column 1], [values of column 2], ...]}
+    :return: amount of exported rows
+    """
+    columns = [column for column, _ in database.get_table_columns(table)]
+    count = 0
+    with open(file_path, "w", encoding="utf-8") as file:
+        for rows in database.get_table_batches(table, batch_size):
+            data = [list(values) for values in zip(*rows)]
+            file.write(
+                json.dumps({"columns": columns, "data": data}, default=_json_default)
+                + "\n"
+            )
+            count = count + len(rows)
+    return count
+
+
+def export_table_parquet(database, table, file_path, batch_size) -> int:
+    """
+    Writes table as Parquet, every batch is one row group
+    :return: amount of exported rows
+    """
+    columns = database.get_table_columns(table)
+    schema = pyarrow.schema(
+        [(column, _arrow_type(declared) or pyarrow.string()) for column, declared in columns]
+    )
+    count = 0
+    with pyarrow.parquet.ParquetWriter(file_path, schema) as writer:
+        for rows in database.get_table_batches(table, batch_size):
+            data = []
+            for (column, declared), values in zip(columns, zip(*rows)):
+                if _arrow_type(declared) is None:
+                    values = [json.dumps(v, default=_json_default) for v in values]
+                data.append(pyarrow.array(values, type=schema.field(column).type))
+            writer.write_table(pyarrow.Table.from_arrays(data, schema=schema))
+            count = count + len(rows)
+    return count
+
+
+def export_catalog(database, output_path, file_format, batch_size):
+    """
+    Exports all catalog tables into output folder, one file per table.
+    Only one batch of rows is held in memory
+    :param CommonDatabaseAccess database: reference to the database
+    :param str output_path: folder for the exported files
+    :param str file_format: "parquet" or "jsonl"
+    :param int batch_size: rows in one batch
+    """
+    if not os.path.exists(output_path):
+        os.makedirs(output_path)
+    for table in CATALOG_TABLES:
+        file_path = output_path + os.sep + table + "." + file_format
+        if file_format == "parquet":
+            count = export_table_parquet(database, table, file_path, batch_size)
+        else:
+            count = export_table_jsonl(database, table, file_path, batch_size)
+        console.print(f"{table} - {count}")
+
+
+def read_table_jsonl(table, file_path):
+    """Streams batches of the table from JSONL file, one line at a time"""
+    with open(file_path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip() == "":
+                continue
+            batch = json.loads(line)
+            yield table, batch["columns"], list(zip(*batch["data"]))
+
+
+def read_table_parquet(database, table, file_path, batch_size):
+    """Streams batches of the table from Parquet file"""
+    declared_types = dict(database.get_table_columns(table))
+    parquet_file = pyarrow.parquet.ParquetFile(file_path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        columns = batch.schema.names
+        data = []
+        for column, values in zip(columns, batch.columns):
+            values = values.to_pylist()
+            if _arrow_type(declared_types.get(column, "")) is None:
+                values = [json.loads(v) if v is not None else None for v in values]
+            data.append(values)
+        yield table, columns, list(zip(*data))
+
+
+def read_catalog(database, input_path, batch_size):
+    """Streams batches of all exported tables, that are found in the input folder"""
+    for table in CATALOG_TABLES:
+        if os.path.exists(input_path + os.sep + table + ".parquet"):
+            if pyarrow is None:
+                raise RuntimeError("pyarrow is needed to import Parquet files")
+            yield from read_table_parquet(
+                database, table, input_path + os.sep + table + ".parquet", batch_size
+            )
+        elif os.path.exists(input_path + os.sep + table + ".jsonl"):
+            yield from read_table_jsonl(table, input_path + os.sep + table + ".jsonl")
+
+
+def import_catalog(database, input_path, batch_size):
+    """
+    Bulk loads exported catalog in one transaction. Ids are kept,
+    so it is meant for seeding fresh database
+    :param CommonDatabaseAccess database: reference to the database
+    :param str input_path: folder with the exported files
+    :param int batch_size: rows in one batch
+    """
+    count = database.bulk_load(read_catalog(database, input_path, batch_size))
+    console.print(f"Imported rows - {count}")
+
+
+def merge_catalogs(database, db_paths):
+    """
+    Merges other catalog files into the database, one transaction per file
+    :param CommonDatabaseAccess database: reference to the target database
+    :param [str] db_paths: paths to the merged database files
+    """
+    for db_path in db_paths:
+        result = database.merge_database(db_path)
+        console.print(
+            f"{db_path} - asset types {result['asset_types']}, "
+            f"categories {result['categories']}, assets {result['assets']}"
+        )
+
+
+def report_across_catalogs(database, db_paths):
+    """
+    Prints asset count by asset type and category across database and attached catalog files,
+    every asset is counted once by url
+    :param CommonDatabaseAccess database: reference to the main database
+    :param [str] db_paths: paths to the attached database files
+    """
+    shards = []
+    for index, db_path in enumerate(db_paths):
+        database.attach_database(db_path, f"shard{index}", read_only=True)
+        shards.append(f"shard{index}")
+    try:
+        console.print(database.prepare_asset_type_and_category_dictionary(shards))
+    finally:
+        for shard in shards:
+            database.detach_database(shard)
+
+
+def main():
+    """Command line entry for the catalog tools"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-d",
+        "--database",
+        default="all_assets.db",
+        help="Path to the SQLite file. (Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5000,
+        help="Rows read and written at once. (Default is %(default)s)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Export catalog to files.")
+    export_parser.add_argument("output", help="Folder for the exported files.")
+    export_parser.add_argument(
+        "--format",
+        choices=["parquet", "jsonl"],
+        default="parquet" if pyarrow is not None else "jsonl",
+        help="File format. (Default is %(default)s)",
+    )
+    import_parser = commands.add_parser(
+        "import", help="Import exported catalog into new database."
+    )
+    import_parser.add_argument("input", help="Folder with the exported files.")
+    merge_parser = commands.add_parser(
+        "merge", help="Merge other catalog files into database."
+    )
+    merge_parser.add_argument("sources", nargs="+", help="Merged database files.")
+    report_parser = commands.add_parser(
+        "report", help="Asset count across database and other catalog files."
+    )
+    report_parser.add_argument(
+        "shards", nargs="*", help="Other database files, that are attached."
+    )
+    args = parser.parse_args()
+
+    console.print("version " + global_data["version"])
+    if args.command == "export":
+        if args.format == "parquet" and pyarrow is None:
+            console.print("pyarrow is not installed, use --format jsonl")
+            return
+        database = CommonDatabaseAccess(db_path=args.database, force=False)
+        export_catalog(database, args.output, args.format, args.batch_size)
+    elif args.command == "import":
+        database = CommonDatabaseAccess(db_path=args.database, force=True)
+        import_catalog(database, args.input, args.batch_size)
+    elif args.command == "merge":
+        database = CommonDatabaseAccess(db_path=args.database, force=True)
+        merge_catalogs(database, args.sources)
+    elif args.command == "report":
+        database = CommonDatabaseAccess(db_path=args.database, force=False)
+        report_across_catalogs(database, args.shards)
+    console.print("All Done !!!")
+
+
+if __name__ == "__main__":
+    main()
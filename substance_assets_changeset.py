@@ -0,0 +1,269 @@
+"""
+Diff stage of the category scan of https://substance3d.adobe.com/assets/allassets
+Cards of all scanned categories are compared with the stored catalog at once in memory.
+Result is a changeset of new, updated, moved, removed and refreshed assets,
+that is applied in one transaction and that the scan report is made from
+"""
+from common_database_access import ASSET_COLUMNS
+
+# "updated" - preview image or name changed, or asset is marked as updated, or removed asset is back
+# "moved" - asset is in another category
+# "removed" - asset of the fully scanned category was not found in any scanned category
+# "refreshed" - only offered formats changed, it is not reported
+CHANGESET_KINDS = ("new", "updated", "moved", "removed", "refreshed")
+
+
+def record_asset_changes(input_value, asset) -> None:
+    """Queues change events for the changed fields of the asset,
+    they are written to the database together with the asset
+
+    :param {} input_value: scan state with "scan_id", "utc_timestamp" and "changes"
+    :param AssetRecord asset: asset loaded from the database and changed by the scan
+    """
+    for field in asset.changed_fields():
+        if field in ASSET_COLUMNS and field != "last_change_date":
+            input_value["changes"].append(
+                {
+                    "scan": input_value["scan_id"],
+                    "asset": asset["id"],
+                    "field": field,
+                    "old_value": asset.original.get(field),
+                    "new_value": asset[field],
+                    "change_date": input_value["utc_timestamp"],
+                }
+            )
+
+
+def load_known_assets(input_value, database) -> None:
+    """Preloads all assets and category names once per scan, so cards are matched in memory
+
+    :param {} input_value: scan state, "known_assets", "assets_by_url", "assets_by_name"
+        and "category_names" are stored in it
+    :param database: reference to the common_database_access.py
+    """
+    input_value["known_assets"] = database.get_all_assets()
+    input_value["assets_by_url"] = {}
+    input_value["assets_by_name"] = {}
+    for asset in input_value["known_assets"]:
+        # first asset with the same url stays, same as in database query
+        input_value["assets_by_url"].setdefault(asset["url"], asset)
+        input_value["assets_by_name"].setdefault(asset["name"], []).append(asset)
+    input_value["category_names"] = {
+        cat["id"]: cat["name"] for cat in database.get_all_categories()
+    }
+
+
+def find_known_assets(input_value, url, name) -> []:
+    """Assets with the url, or with the name, if no asset has the url"""
+    if url in input_value["assets_by_url"]:
+        return [input_value["assets_by_url"][url]]
+    return input_value["assets_by_name"].get(name, [])
+
+
+def card_formats(card) -> {}:
+    """Format columns of the asset offered by the card"""
+    return {
+        "format_sbsar": "SBSAR" in card["formats"],
+        "format_sbs": "SBS" in card["formats"],
+        "format_exr": "EXR" in card["formats"],
+        "format_fbx": "FBX" in card["formats"],
+        "format_glb": "GLB" in card["formats"],
+        "format_mdl": "MDL" in card["formats"],
+    }
+
+
+def build_changeset(
+        input_value, category_cards, complete_ids, applied_cards=(), max_removed_share=1.0
+) -> {}:
+    """
+    Compares cards of all scanned categories with the stored catalog.
+    Every asset and every new url is taken only once, from the first card in the scan order.
+    Nothing is changed, neither in the database, nor in the loaded assets
+
+    :param {} input_value: scan state with lookup maps, see load_known_assets
+    :param [] category_cards: [(category, cards)] of all scanned categories in the scan order
+    :param set complete_ids: ids of the categories, whose cards are complete lists,
+        so their assets not found in any category are removed
+    :param [] applied_cards: [(category, cards)] of the categories of the same scan,
+        that were applied before it was resumed, their assets are only found, not changed
+    :param float max_removed_share: assets of the category are not removed,
+        when more than this share of its assets, and more than one, would be removed at once,
+        it rather means a broken page than a removal
+    :return: {kind: [{"asset", "category", "card"}]} for the CHANGESET_KINDS,
+        "asset" is None for the new until the changeset is applied,
+        "category" and "card" are None for the removed,
+        "removal_skipped" lists {"category", "missing", "known"} of the categories,
+        whose assets were not removed because of max_removed_share
+    """
+    changeset = {kind: [] for kind in CHANGESET_KINDS}
+    changeset["removal_skipped"] = []
+    matched_ids = set()
+    new_urls = set()
+    for _, cards in applied_cards:
+        for card in cards:
+            known = find_known_assets(input_value, card["href"], card["name"])
+            if len(known) > 0:
+                matched_ids.add(known[0]["id"])
+    for cat, cards in category_cards:
+        for card in cards:
+            # card with not loaded preview still finds its asset, so it is not removed,
+            # but its placeholder image brings no new or changed asset
+            loaded = card["image"].startswith("https://")
+            known = find_known_assets(input_value, card["href"], card["name"])
+            if len(known) == 0:
+                if loaded and card["href"] not in new_urls:
+                    new_urls.add(card["href"])
+                    changeset["new"].append({"asset": None, "category": cat, "card": card})
+                continue
+            asset = known[0]
+            if asset["id"] in matched_ids:
+                continue
+            matched_ids.add(asset["id"])
+            if not loaded:
+                continue
+            entry = {"asset": asset, "category": cat, "card": card}
+            if asset["category"] != cat["id"]:
+                changeset["moved"].append(entry)
+            elif (
+                    asset["preview_image"] != card["image"]
+                    or card["need_update"]
+                    or asset["name"] != card["name"]
+                    or asset["removed"]
+            ):
+                changeset["updated"].append(entry)
+            elif any(
+                    asset[field] != offered for field, offered in card_formats(card).items()
+            ):
+                changeset["refreshed"].append(entry)
+    known_counts = {}
+    missing = {}
+    for asset in input_value["known_assets"]:
+        if asset["category"] in complete_ids and not asset["removed"]:
+            known_counts[asset["category"]] = known_counts.get(asset["category"], 0) + 1
+            if asset["id"] not in matched_ids:
+                missing.setdefault(asset["category"], []).append(asset)
+    for category_id, assets in missing.items():
+        # single asset can be removed also from a small category
+        if len(assets) > max(1, max_removed_share * known_counts[category_id]):
+            changeset["removal_skipped"].append(
+                {
+                    "category": category_id,
+                    "missing": len(assets),
+                    "known": known_counts[category_id],
+                }
+            )
+            continue
+        for asset in assets:
+            changeset["removed"].append({"asset": asset, "category": None, "card": None})
+    return changeset
+
+
+def apply_changeset(database, input_value, changeset) -> None:
+    """
+    Writes changeset to the database with its change events,
+    it is meant to be called inside database.batch_write, so all is one transaction.
+    New entries get their inserted "asset", updated and moved entries keep
+    category of the asset before the scan as "previous_category"
+
+    :param database: reference to the common_database_access.py
+    :param {} input_value: scan state with "scan_id", "utc_timestamp" and "changes"
+    :param {} changeset: see build_changeset
+    """
+    for entry in changeset["new"]:
+        card = entry["card"]
+        asset_data = {
+            "name": card["name"],
+            "url": card["href"],
+            "category": entry["category"]["id"],
+            "preview_image": card["image"],
+            "details_image": "",
+            "variant_1_image": "",
+            "variant_2_image": "",
+            "variant_3_image": "",
+            "have_preview_image_changed": False,
+            "have_details_image_changed": False,
+            "have_variant_1_image_changed": False,
+            "have_variant_2_image_changed": False,
+            "have_variant_3_image_changed": False,
+            "last_change_date": input_value["utc_timestamp"],
+            "need_to_check": True,
+            "have_format_sbsar": False,
+            "have_format_sbs": False,
+            "have_format_exr": False,
+            "have_format_fbx": False,
+            "have_format_glb": False,
+            "have_format_mdl": False,
+        }
+        asset_data.update(card_formats(card))
+        asset_id = database.set_new_asset(asset_data)
+        entry["asset"] = database.get_asset_by_id(asset_id)[0]
+        input_value["changes"].append(
+            {
+                "scan": input_value["scan_id"],
+                "asset": asset_id,
+                "field": "asset",
+                "old_value": None,
+                "new_value": card["name"],
+                "change_date": input_value["utc_timestamp"],
+            }
+        )
+
+    changed = []
+    for entry in changeset["updated"] + changeset["moved"]:
+        asset = entry["asset"]
+        entry["previous_category"] = asset["category"]
+        asset["name"] = entry["card"]["name"]
+        asset["url"] = entry["card"]["href"]
+        asset["category"] = entry["category"]["id"]
+        asset["preview_image"] = entry["card"]["image"]
+        asset["have_preview_image_changed"] = True
+        asset["last_change_date"] = input_value["utc_timestamp"]
+        asset["need_to_check"] = True
+        asset["removed"] = False
+        asset.update(card_formats(entry["card"]))
+        changed.append(asset)
+    for entry in changeset["refreshed"]:
+        entry["asset"].update(card_formats(entry["card"]))
+        changed.append(entry["asset"])
+    for entry in changeset["removed"]:
+        entry["asset"]["removed"] = True
+        entry["asset"]["last_change_date"] = input_value["utc_timestamp"]
+        changed.append(entry["asset"])
+
+    for asset in changed:
+        record_asset_changes(input_value, asset)
+    database.update_assets(changed)
+    database.set_new_asset_changes(input_value["changes"])
+    input_value["changes"] = []
+
+
+def changeset_report(changeset, category_names) -> {}:
+    """
+    Scan report made from the changeset, it is built before the changeset is applied
+    :param {} changeset: see build_changeset
+    :param {} category_names: {category id: name}
+    :return: {"new_elements_count", "updated_elements_count", "changed_category",
+        "removed_elements": [lines]}
+    """
+    return {
+        "new_elements_count": [
+            category_names[entry["category"]["id"]] + " -- " + entry["card"]["name"]
+            for entry in changeset["new"]
+        ],
+        "updated_elements_count": [
+            category_names[entry["category"]["id"]] + " -- " + entry["card"]["name"]
+            for entry in changeset["updated"]
+        ],
+        "changed_category": [
+            entry["card"]["name"]
+            + " -- *From* "
+            + category_names[entry["asset"]["category"]]
+            + " *To* "
+            + category_names[entry["category"]["id"]]
+            for entry in changeset["moved"]
+        ],
+        "removed_elements": [
+            category_names[entry["asset"]["category"]] + " -- " + entry["asset"]["name"]
+            for entry in changeset["removed"]
+        ],
+    }
@@ -0,0 +1,201 @@
+"""
+Plain HTTP backend for the category scan of https://substance3d.adobe.com/assets/allassets
+Reads the same asset listing the page loads for itself, without starting a browser.
+
+The page asks the GraphQL endpoint of the asset library (ASSETS_ENDPOINT, --http-endpoint)
+with the Assets query (ASSETS_QUERY) page by page. Asset type and category filter
+are taken from the category url, ?assetType=substanceMaterial&category=Wood, and the answer is
+{
+    "data": {
+        "assets": {
+            "total": 600,
+            "hasMore": true,
+            "items": [
+                {
+                    "id": "oak-planks",
+                    "title": "Oak Planks",
+                    "createdAt": "2021-04-01T10:00:00.000Z",
+                    "updatedAt": "2021-11-18T09:30:00.000Z",
+                    "attachments": [
+                        {"__typename": "PreviewAttachment", "tags": ["thumbnail"], "url": "..."},
+                        {"__typename": "DownloadAttachment", "format": "sbsar", "url": "..."}
+                    ]
+                },
+            ]
+        }
+    }
+}
+Recorded answers are replayed by the local stub, see substance_assets_http_stub.py,
+its record command stores the answers of the real endpoint as the fixtures.
+"""
+import datetime
+
+from urllib.parse import urlparse, parse_qsl
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+ASSETS_ENDPOINT = "https://source-api.substance3d.com/beta/graphql"
+ASSET_PAGE_URL = "https://substance3d.adobe.com/assets/allassets/{}"
+
+ASSETS_QUERY = """query Assets($page: Int, $limit: Int, $sort: AssetSort, $sortDir: SortDir,
+ $filters: AssetFilters) {
+  assets(page: $page, limit: $limit, sort: $sort, sortDir: $sortDir, filters: $filters) {
+    total
+    hasMore
+    items {
+      id
+      title
+      createdAt
+      updatedAt
+      attachments {
+        __typename
+        ... on PreviewAttachment { tags url }
+        ... on DownloadAttachment { format url }
+      }
+    }
+  }
+}"""
+
+# card of the asset updated within these days is marked as UPDATED on the page
+UPDATED_DAYS = 30
+
+
+def create_session(pool_size=8) -> requests.Session:
+    """
+    Session with pooled keep-alive connections and retries on the server errors
+    :param int pool_size: amount of kept connections
+    :return: requests session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=None,  # query is sent by POST, it only reads
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+def category_filters(category_url) -> {}:
+    """
+    Filters of the Assets query for the category
+    :param str category_url: url of the category, its query has assetType and category
+    :return: value of the $filters variable
+    """
+    query = dict(parse_qsl(urlparse(category_url).query))
+    return {
+        "status": ["published"],
+        "type": query.get("assetType", ""),
+        "categories": [query["category"]] if "category" in query else [],
+    }
+
+
+def assets_request(filters, page, page_size) -> {}:
+    """JSON body of one Assets query, newest assets first, same as the page asks"""
+    return {
+        "operationName": "Assets",
+        "query": ASSETS_QUERY,
+        "variables": {
+            "page": page,
+            "limit": page_size,
+            "sort": "byPublicationDate",
+            "sortDir": "desc",
+            "filters": filters,
+        },
+    }
+
+
+def _parse_time(value):
+    return datetime.datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+
+
+def card_from_item(item, now=None) -> {}:
+    """
+    Converts one listing item to the card used by the category scan
+    :param {} item: item of the Assets answer
+    :param datetime now: UTC time the UPDATED mark is compared with, current time by default
+    :return: {"href", "image", "name", "formats", "need_update"}
+    """
+    now = now or datetime.datetime.utcnow()
+    previews = [
+        a for a in item.get("attachments", []) if a["__typename"] == "PreviewAttachment"
+    ]
+    thumbnails = [a for a in previews if "thumbnail" in a.get("tags", [])] or previews
+    formats = []
+    for attachment in item.get("attachments", []):
+        if attachment["__typename"] == "DownloadAttachment":
+            asset_format = attachment["format"].upper()
+            if asset_format not in formats:
+                formats.append(asset_format)
+    need_update = False
+    if item.get("updatedAt") and item.get("createdAt"):
+        updated = _parse_time(item["updatedAt"])
+        need_update = (
+            updated > _parse_time(item["createdAt"])
+            and now - updated <= datetime.timedelta(days=UPDATED_DAYS)
+        )
+    return {
+        "href": ASSET_PAGE_URL.format(item["id"]),
+        "image": thumbnails[0]["url"].split("?", 1)[0] if len(thumbnails) > 0 else "",
+        "name": item["title"],
+        "formats": formats,
+        "need_update": need_update,
+    }
+
+
+def fetch_category_items(session, endpoint, category_url, page_size=100, timeout=30) -> []:
+    """
+    Reads all listing items of one category page by page, as they are answered
+    :param requests.Session session: session from create_session
+    :param str endpoint: url of the GraphQL endpoint
+    :param str category_url: url of the category, its query has the category filter
+    :param int page_size: items asked in one request
+    :param int timeout: seconds to wait for one answer
+    :return: list of items, see module docstring
+    """
+    filters = category_filters(category_url)
+    items = []
+    page = 0
+    while True:
+        response = session.post(
+            endpoint, json=assets_request(filters, page, page_size), timeout=timeout
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get("errors"):
+            raise requests.exceptions.RequestException(
+                "; ".join(error.get("message", "") for error in payload["errors"])
+            )
+        assets = payload["data"]["assets"]
+        items.extend(assets["items"])
+        page = page + 1
+        # "total" guards against an endpoint, that keeps "hasMore" on the last page
+        if (
+                len(assets["items"]) == 0
+                or not assets.get("hasMore", False)
+                or len(items) >= assets.get("total", len(items) + 1)
+        ):
+            break
+    return items
+
+
+def fetch_category_cards(session, endpoint, category_url, page_size=100, timeout=30) -> []:
+    """
+    Reads all cards of one category, see fetch_category_items
+    :return: list of cards, see card_from_item
+    """
+    now = datetime.datetime.utcnow()
+    return [
+        card_from_item(item, now)
+        for item in fetch_category_items(session, endpoint, category_url, page_size, timeout)
+    ]
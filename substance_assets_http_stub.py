@@ -0,0 +1,165 @@
+"""
+Local stub of the GraphQL endpoint for substance_assets_http_scanner.py
+Serves recorded answers from fixtures/http_listing, one JSON file per category
+{"filters": {$filters variable of the category}, "items": [items as the endpoint answered]}
+Items are paged by the "page" and "limit" variables the same way as the endpoint does.
+Fixture with "errors" instead of "items" is answered with these GraphQL errors.
+
+    python substance_assets_http_stub.py record --endpoint https://... \\
+        --category-url "https://substance3d.adobe.com/assets/allassets?assetType=substanceMaterial&category=Wood"
+    python substance_assets_http_stub.py serve --port 8765
+    python substance_assets_page_scraper.py --http-endpoint http://127.0.0.1:8765/graphql
+
+Committed fixtures are written by hand in the shape of the endpoint answer,
+record replaces them with the real answers
+"""
+import os
+import json
+import argparse
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rich.console import Console
+
+from substance_assets_http_scanner import (
+    ASSETS_ENDPOINT,
+    create_session,
+    category_filters,
+    fetch_category_items,
+)
+
+console = Console()
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "http_listing")
+
+
+def load_fixtures(fixture_dir) -> []:
+    """
+    Reads all recorded answers
+    :param str fixture_dir: folder with JSON files
+    :return: list of fixtures, see module docstring
+    """
+    fixtures = []
+    for name in sorted(os.listdir(fixture_dir)):
+        if name.endswith(".json"):
+            with open(os.path.join(fixture_dir, name), encoding="utf-8") as file:
+                fixtures.append(json.load(file))
+    return fixtures
+
+
+def answer_assets_query(fixtures, variables) -> {}:
+    """
+    Answer of the endpoint to one Assets query, category without fixture has no items
+    :param [] fixtures: fixtures, see load_fixtures
+    :param {} variables: variables of the query, see assets_request
+    :return: GraphQL answer
+    """
+    fixture = next((f for f in fixtures if f["filters"] == variables["filters"]), None)
+    if fixture is not None and "errors" in fixture:
+        return {"errors": fixture["errors"]}
+    items = fixture["items"] if fixture is not None else []
+    start = variables["page"] * variables["limit"]
+    end = start + variables["limit"]
+    return {
+        "data": {
+            "assets": {
+                "total": len(items),
+                "hasMore": end < len(items),
+                "items": items[start:end],
+            }
+        }
+    }
+
+
+def create_stub_server(fixtures, port=0) -> ThreadingHTTPServer:
+    """
+    HTTP server answering the Assets queries from the fixtures.
+    Variables of every served query are added to server.requests
+    :param [] fixtures: fixtures, see load_fixtures
+    :param int port: port on 127.0.0.1, 0 for any free port
+    :return: server, that is not started yet
+    """
+
+    class GraphQLHandler(BaseHTTPRequestHandler):
+        """Answers one Assets query"""
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.server.requests.append(request["variables"])
+            body = json.dumps(answer_assets_query(fixtures, request["variables"])).encode(
+                "utf-8"
+            )
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), GraphQLHandler)
+    server.requests = []
+    return server
+
+
+def record_fixture(endpoint, category_url, fixture_dir) -> str:
+    """
+    Stores all items of the category answered by the endpoint as the fixture
+    :param str endpoint: url of the GraphQL endpoint
+    :param str category_url: url of the category
+    :param str fixture_dir: folder for the fixture
+    :return: path to the written fixture
+    """
+    filters = category_filters(category_url)
+    session = create_session()
+    try:
+        items = fetch_category_items(session, endpoint, category_url)
+    finally:
+        session.close()
+    name = "_".join([filters["type"]] + filters["categories"]).lower().replace(" ", "-")
+    file_path = os.path.join(fixture_dir, name + ".json")
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump({"filters": filters, "items": items}, file, indent=2)
+    return file_path
+
+
+def main():
+    """Command line entry of the stub"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--fixtures",
+        default=FIXTURE_DIR,
+        help="Folder with the recorded answers. (Default is %(default)s)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Serve the recorded answers.")
+    serve_parser.add_argument(
+        "--port", type=int, default=8765, help="Port on 127.0.0.1. (Default is %(default)s)"
+    )
+    record_parser = commands.add_parser(
+        "record", help="Record answers of the endpoint for the categories."
+    )
+    record_parser.add_argument(
+        "--endpoint", default=ASSETS_ENDPOINT, help="GraphQL endpoint. (Default is %(default)s)"
+    )
+    record_parser.add_argument(
+        "--category-url", action="append", required=True, help="Url of the recorded category."
+    )
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = create_stub_server(load_fixtures(args.fixtures), args.port)
+        console.print(f"Serving http://127.0.0.1:{args.port}/graphql")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+    else:
+        for category_url in args.category_url:
+            console.print(record_fixture(args.endpoint, category_url, args.fixtures))
+        console.print("All Done !!!")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ and saved in local SQLite file
 import os
 import time
 import sys
+import itertools
+import argparse
 
 import platform
 
@@ -18,7 +20,12 @@ from rich.console import Console
 from rich.traceback import install
 from rich.progress import track
 
-from common_database_access import CommonDatabaseAccess
+from common_database_access import (
+    CommonDatabaseAccess,
+    ASSET_FORMATS,
+    format_names,
+    normalize_asset_name,
+)
 
 import f_icon
 
@@ -68,22 +75,56 @@ def check_for_download(url, file_path, need_to_refresh):
         download_image(url, file_path)
 
 
-def convert_to_nice_name(filename) -> str:
+def asset_path(asset) -> str:
     """
-    Replaces _ with spaces in filename
-    :param str filename: filename to convert
-    :return:
+    Local folder of the asset from the joined asset view
+    :param {} asset: record from CommonDatabaseAccess.get_assets_with_path
+    :return: full path to the asset folder, without trailing separator
     """
-    return filename.replace("_", " ")
+    return global_data["local_path"] + os.sep + asset["relative_path"]
 
 
-def convert_to_ugly_name(filename) -> str:
+def group_by_category(assets):
     """
-    Replaces space with _ in filename
-    :param str filename: filename to convert
-    :return:
+    Groups streamed assets by asset type and category, keeping stream order
+    :param assets: records from CommonDatabaseAccess.get_assets_with_path
+    :return: iterator of ((asset type name, category name), assets)
+    """
+    return itertools.groupby(
+        assets, key=lambda asset: (asset["asset_type_name"], asset["category_name"])
+    )
+
+
+def category_path(asset_type_name, category_name) -> str:
     """
-    return filename.replace(" ", "_")
+    Local folder of the category
+    :param str asset_type_name: name of the asset type
+    :param str category_name: name of the category
+    :return: full path to the category folder
+    """
+    return global_data["local_path"] + os.sep + asset_type_name + os.sep + category_name
+
+
+def find_asset_for_file(filename, assets_by_name):
+    """
+    Finds asset for the file from _source folder.
+    Not jpg files must have asset name without extension,
+    jpg files must contain asset name (longest match wins)
+    :param str filename: name of the file
+    :param {} assets_by_name: lower case normalised asset name: asset
+    :return: asset or None
+    """
+    file_details = os.path.splitext(filename)
+    nice_name = normalize_asset_name(file_details[0]).lower()
+    if file_details[1].lower() != ".jpg":
+        return assets_by_name.get(nice_name)
+    words = nice_name.split(" ")
+    for length in range(len(words), 0, -1):
+        for start in range(0, len(words) - length + 1):
+            asset = assets_by_name.get(" ".join(words[start : start + length]))
+            if asset is not None:
+                return asset
+    return None
 
 
 def create_folder_for_type(database, asset_types):
@@ -96,36 +137,17 @@ def create_folder_for_type(database, asset_types):
     console.print("Creating folders ...")
     for a in asset_types:  # track(asset_types, description="Types."):
         categories = database.get_all_categories_by_asset_type_id(a["id"])
-        if not os.path.exists(global_data["local_path"] + os.sep + a["name"]):
-            os.makedirs(global_data["local_path"] + os.sep + a["name"])
-        for c in categories:  # track(categories, description="Categories."):
-            assets = database.get_all_assets_by_category(c["id"])
-            if not os.path.exists(
-                global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-            ):
-                os.makedirs(
-                    global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-                )
-            console.print(f"{a['name']} - {c['name']}")
+        for c in categories:  # empty categories get their folders too
+            if not os.path.exists(category_path(a["name"], c["name"])):
+                os.makedirs(category_path(a["name"], c["name"]))
+        for (type_name, category_name), assets in group_by_category(
+            database.get_assets_with_path(asset_type_id=a["id"])
+        ):
+            assets = list(assets)
+            console.print(f"{type_name} - {category_name}")
             for asset in track(assets, description="Assets.", total=len(assets)):
-                if not os.path.exists(
-                    global_data["local_path"]
-                    + os.sep
-                    + a["name"]
-                    + os.sep
-                    + c["name"]
-                    + os.sep
-                    + asset["name"]
-                ):
-                    os.makedirs(
-                        global_data["local_path"]
-                        + os.sep
-                        + a["name"]
-                        + os.sep
-                        + c["name"]
-                        + os.sep
-                        + asset["name"]
-                    )
+                if not os.path.exists(asset_path(asset)):
+                    os.makedirs(asset_path(asset))
 
     input("Press any enter to close...")
 
@@ -167,256 +189,119 @@ def create_folders(database):
                 menu_exit = True
 
 
+def download_asset_images(database, asset):
+    """
+    Downloads preview, details and variant images into the asset folder,
+    changed images replace the old ones, that are kept with the date added
+    :param CommonDatabaseAccess database: reference to the database
+    :param {} asset: record from CommonDatabaseAccess.get_assets_with_path
+    """
+    local_path = asset_path(asset) + os.sep
+    # console.print(asset)
+    check_for_download(
+        asset["preview_image"],
+        local_path + "Preview.png",
+        asset["have_preview_image_changed"],
+    )
+    check_for_download(
+        asset["details_image"],
+        local_path + "Details.png",
+        asset["have_details_image_changed"],
+    )
+    check_for_download(
+        asset["variant_1_image"],
+        local_path + "Variant1.png",
+        asset["have_variant_1_image_changed"],
+    )
+    check_for_download(
+        asset["variant_2_image"],
+        local_path + "Variant2.png",
+        asset["have_variant_2_image_changed"],
+    )
+    check_for_download(
+        asset["variant_3_image"],
+        local_path + "Variant3.png",
+        asset["have_variant_3_image_changed"],
+    )
+    database.set_asset_art_as_updated(asset["id"])
+
+
+def make_asset_icon(asset, ignore_created=True):
+    """
+    Creates folder icon of the asset from its Preview.png
+    :param {} asset: record from CommonDatabaseAccess.get_assets_with_path
+    :param bool ignore_created: on Windows also locations, that already have Preview.ico
+    """
+    local_path = asset_path(asset) + os.sep
+    if platform.system() == "Windows":
+        if os.path.exists(local_path + "Preview.png") and (
+            not os.path.exists(local_path + "Preview.ico") or ignore_created
+        ):
+            f_icon.create_icon(local_path + "Preview.png")
+    else:
+        if os.path.exists(local_path + "Preview.png"):
+            f_icon.create_icon(local_path + "Preview.png")
+
+
 def download_all_images(database):
     console.print("Downloading images ...")
-    asset_types = database.get_all_asset_types()
-    for a in asset_types:  # track(asset_types, description="Types."):
-        categories = database.get_all_categories_by_asset_type_id(a["id"])
-        if not os.path.exists(global_data["local_path"] + os.sep + a["name"]):
+    for (type_name, category_name), assets in group_by_category(
+        database.get_assets_with_path()
+    ):
+        if not os.path.exists(category_path(type_name, category_name)):
             continue
-        for c in categories:  # track(categories, description="Categories."):
-            assets = database.get_all_assets_by_category(c["id"])
-            if not os.path.exists(
-                global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-            ):
-                continue
-            console.print(f"{a['name']} - {c['name']}")
-            for asset in track(assets, description="Assets.", total=len(assets)):
-                if os.path.exists(
-                    global_data["local_path"]
-                    + os.sep
-                    + a["name"]
-                    + os.sep
-                    + c["name"]
-                    + os.sep
-                    + asset["name"]
-                ):
-                    local_path = (
-                        global_data["local_path"]
-                        + os.sep
-                        + a["name"]
-                        + os.sep
-                        + c["name"]
-                        + os.sep
-                        + asset["name"]
-                        + os.sep
-                    )
-                    # console.print(asset)
-                    check_for_download(
-                        asset["preview_image"],
-                        local_path + "Preview.png",
-                        asset["have_preview_image_changed"],
-                    )
-                    check_for_download(
-                        asset["details_image"],
-                        local_path + "Details.png",
-                        asset["have_details_image_changed"],
-                    )
-                    check_for_download(
-                        asset["variant_1_image"],
-                        local_path + "Variant1.png",
-                        asset["have_variant_1_image_changed"],
-                    )
-                    check_for_download(
-                        asset["variant_2_image"],
-                        local_path + "Variant2.png",
-                        asset["have_variant_2_image_changed"],
-                    )
-                    check_for_download(
-                        asset["variant_3_image"],
-                        local_path + "Variant3.png",
-                        asset["have_variant_3_image_changed"],
-                    )
-                    database.set_asset_art_as_updated(asset["id"])
+        assets = list(assets)
+        console.print(f"{type_name} - {category_name}")
+        for asset in track(assets, description="Assets.", total=len(assets)):
+            if os.path.exists(asset_path(asset)):
+                download_asset_images(database, asset)
 
     input("Press any enter to close...")
 
 
 def make_all_icons(database, ignore_created=True):
     console.print("Creating folder icons ...")
-    asset_types = database.get_all_asset_types()
-    for a in asset_types:  # track(asset_types, description="Types."):
-        categories = database.get_all_categories_by_asset_type_id(a["id"])
-        if not os.path.exists(global_data["local_path"] + os.sep + a["name"]):
+    for (type_name, category_name), assets in group_by_category(
+        database.get_assets_with_path()
+    ):
+        if not os.path.exists(category_path(type_name, category_name)):
             continue
-        for c in categories:  # track(categories, description="Categories."):
-            assets = database.get_all_assets_by_category(c["id"])
-            if not os.path.exists(
-                global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-            ):
-                continue
-            console.print(f"{a['name']} - {c['name']}")
-            for asset in track(assets, description="Assets.", total=len(assets)):
-                if os.path.exists(
-                    global_data["local_path"]
-                    + os.sep
-                    + a["name"]
-                    + os.sep
-                    + c["name"]
-                    + os.sep
-                    + asset["name"]
-                ):
-                    local_path = (
-                        global_data["local_path"]
-                        + os.sep
-                        + a["name"]
-                        + os.sep
-                        + c["name"]
-                        + os.sep
-                        + asset["name"]
-                        + os.sep
-                    )
-                    # console.print(asset)
-                    if platform.system() == "Windows":
-                        if os.path.exists(local_path + "Preview.png") and (
-                            not os.path.exists(local_path + "Preview.ico")
-                            or ignore_created
-                        ):
-                            f_icon.create_icon(local_path + "Preview.png")
-                    else:
-                        if os.path.exists(local_path + "Preview.png"):
-                            f_icon.create_icon(local_path + "Preview.png")
+        assets = list(assets)
+        console.print(f"{type_name} - {category_name}")
+        for asset in track(assets, description="Assets.", total=len(assets)):
+            if os.path.exists(asset_path(asset)):
+                make_asset_icon(asset, ignore_created)
 
     input("Press any enter to close...")
 
 
 def transfer_all_local_files(database):
     console.print("Placing files in corresponding folders ...")
-    files = os.listdir(global_data["local_path"] + os.sep + global_data["source_path"])
-    asset_types = database.get_all_asset_types()
+    source_path = global_data["local_path"] + os.sep + global_data["source_path"]
+    files = os.listdir(source_path)
     placement_log = {"moved": [], "existing": [], "missing": [], "existing_full": []}
-    for a in asset_types:  # track(asset_types, description="Types."):
-        categories = database.get_all_categories_by_asset_type_id(a["id"])
-        if not os.path.exists(global_data["local_path"] + os.sep + a["name"]):
+    assets_by_name = {}
+    # files of the removed assets are still placed into their folders
+    for asset in database.get_assets_with_path(include_removed=True):
+        if asset["name_key"].lower() not in assets_by_name and os.path.exists(
+            asset_path(asset)
+        ):
+            assets_by_name[asset["name_key"].lower()] = asset
+    for f in track(files, description="Files.", total=len(files)):
+        asset = find_asset_for_file(f, assets_by_name)
+        if asset is None:
             continue
-        for c in categories:  # track(categories, description="Categories."):
-            assets = database.get_all_assets_by_category(c["id"])
-            if not os.path.exists(
-                global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-            ):
-                continue
-            console.print(f"{a['name']} - {c['name']}")
-            for asset in track(assets, description="Assets.", total=len(assets)):
-                if os.path.exists(
-                    global_data["local_path"]
-                    + os.sep
-                    + a["name"]
-                    + os.sep
-                    + c["name"]
-                    + os.sep
-                    + asset["name"]
-                ):
-                    for (
-                        f
-                    ) in (
-                        files
-                    ):  # going over all files in the _source folder that we know from the start
-                        if os.path.exists(  # checking, that file is still there. can be moved already
-                            global_data["local_path"]
-                            + os.sep
-                            + global_data["source_path"]
-                            + os.sep
-                            + f
-                        ):
-                            if not os.path.exists(  # checking, that this file already exists at destination.
-                                global_data[
-                                    "local_path"
-                                ]  # if it is, then we have a double
-                                + os.sep
-                                + a["name"]
-                                + os.sep
-                                + c["name"]
-                                + os.sep
-                                + asset["name"]
-                                + os.sep
-                                + f
-                            ):
-                                if (
-                                    f.lower().endswith(".jpg")
-                                    and convert_to_nice_name(f.lower()).find(
-                                        asset["name"].lower()
-                                    )
-                                    >= 0
-                                ):
-                                    # if it is jpeg, then extra case. We check if asset name is inside file name
-                                    os.rename(
-                                        global_data["local_path"]
-                                        + os.sep
-                                        + global_data["source_path"]
-                                        + os.sep
-                                        + f,
-                                        global_data["local_path"]
-                                        + os.sep
-                                        + a["name"]
-                                        + os.sep
-                                        + c["name"]
-                                        + os.sep
-                                        + asset["name"]
-                                        + os.sep
-                                        + f,
-                                    )
-                                    placement_log["moved"].append(
-                                        global_data["local_path"]
-                                        + os.sep
-                                        + a["name"]
-                                        + os.sep
-                                        + c["name"]
-                                        + os.sep
-                                        + asset["name"]
-                                        + os.sep
-                                        + f
-                                    )
-                                elif not f.lower().endswith(
-                                    ".jpg"
-                                ):  # if this is not a jpg, then we check name
-                                    # without extension to match with asset name
-                                    file_details = os.path.splitext(f)
-                                    if (
-                                        convert_to_nice_name(file_details[0].lower())
-                                        == asset["name"].lower()
-                                    ):
-                                        os.rename(
-                                            global_data["local_path"]
-                                            + os.sep
-                                            + global_data["source_path"]
-                                            + os.sep
-                                            + f,
-                                            global_data["local_path"]
-                                            + os.sep
-                                            + a["name"]
-                                            + os.sep
-                                            + c["name"]
-                                            + os.sep
-                                            + asset["name"]
-                                            + os.sep
-                                            + f,
-                                        )
-                                        placement_log["moved"].append(
-                                            global_data["local_path"]
-                                            + os.sep
-                                            + a["name"]
-                                            + os.sep
-                                            + c["name"]
-                                            + os.sep
-                                            + asset["name"]
-                                            + os.sep
-                                            + f
-                                        )
-                            else:  # we had a double name, so mark it as double
-                                placement_log["existing_full"].append(
-                                    global_data["local_path"]
-                                    + os.sep
-                                    + a["name"]
-                                    + os.sep
-                                    + c["name"]
-                                    + os.sep
-                                    + asset["name"]
-                                    + os.sep
-                                    + f
-                                )
-                                placement_log["existing"].append(f)
+        destination = asset_path(asset) + os.sep + f
+        # checking, that this file already exists at destination.
+        # if it is, then we have a double
+        if not os.path.exists(destination):
+            os.rename(source_path + os.sep + f, destination)
+            placement_log["moved"].append(destination)
+        else:  # we had a double name, so mark it as double
+            placement_log["existing_full"].append(destination)
+            placement_log["existing"].append(f)
     # generating report
-    files = os.listdir(global_data["local_path"] + os.sep + global_data["source_path"])
+    files = os.listdir(source_path)
     placement_log["missing"] = list(set(files) - set(placement_log["existing"]))
     file = open(
         append_date(global_data["local_path"] + os.sep + "FileTransferReport.txt"),
@@ -443,97 +328,29 @@ def transfer_all_local_files(database):
 
 def generate_detail_report(database):
     console.print("Generating detail report ...")
-    asset_types = database.get_all_asset_types()
     placement_log = {"have": [], "missing": [], "need": []}
-    for a in asset_types:  # track(asset_types, description="Types."):
-        categories = database.get_all_categories_by_asset_type_id(a["id"])
-        if not os.path.exists(global_data["local_path"] + os.sep + a["name"]):
+    for (type_name, category_name), assets in group_by_category(
+        database.get_assets_with_path()
+    ):
+        if not os.path.exists(category_path(type_name, category_name)):
             continue
-        for c in categories:  # track(categories, description="Categories."):
-            assets = database.get_all_assets_by_category(c["id"])
-            if not os.path.exists(
-                global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-            ):
-                continue
-            console.print(f"{a['name']} - {c['name']}")
-            for asset in track(assets, description="Assets.", total=len(assets)):
-                if os.path.exists(
-                    global_data["local_path"]
-                    + os.sep
-                    + a["name"]
-                    + os.sep
-                    + c["name"]
-                    + os.sep
-                    + asset["name"]
-                ):
-                    local_path = (
-                        global_data["local_path"]
-                        + os.sep
-                        + a["name"]
-                        + os.sep
-                        + c["name"]
-                        + os.sep
-                        + asset["name"]
-                        + os.sep
+        assets = list(assets)
+        console.print(f"{type_name} - {category_name}")
+        for asset in track(assets, description="Assets.", total=len(assets)):
+            if os.path.exists(asset_path(asset)):
+                entry = type_name + " > " + category_name + " > " + asset["name"]
+                missing = "".join(
+                    asset_format + " "
+                    for asset_format in format_names(asset["formats_missing"])
+                )
+                if asset["formats_missing"] == 0:
+                    placement_log["have"].append(entry)
+                elif asset["formats_offered"] & asset["formats_owned"]:
+                    placement_log["missing"].append(
+                        entry + " : missing formats " + missing
                     )
-                    count = 0
-                    have = 0
-                    missing = ""
-                    if asset["format_sbsar"]:
-                        count = count + 1
-                        if asset["have_format_sbsar"]:
-                            have = have + 1
-                        else:
-                            missing = missing + "sbsar "
-                        changed_record = True
-                    if asset["format_sbs"]:
-                        count = count + 1
-                        if asset["have_format_sbs"]:
-                            have = have + 1
-                        else:
-                            missing = missing + "sbs "
-                    if asset["format_exr"]:
-                        count = count + 1
-                        if asset["have_format_exr"]:
-                            have = have + 1
-                        else:
-                            missing = missing + "exr "
-                    if asset["format_fbx"]:
-                        count = count + 1
-                        if asset["have_format_fbx"]:
-                            have = have + 1
-                        else:
-                            missing = missing + "fbx "
-                    if asset["format_glb"]:
-                        count = count + 1
-                        if asset["have_format_glb"]:
-                            have = have + 1
-                        else:
-                            missing = missing + "glb "
-                    if asset["format_mdl"]:
-                        count = count + 1
-                        if asset["have_format_mdl"]:
-                            have = have + 1
-                        else:
-                            missing = missing + "mdl "
-                    if count == have:
-                        placement_log["have"].append(
-                            a["name"] + " > " + c["name"] + " > " + asset["name"]
-                        )
-                    elif count != have and have > 0:
-                        placement_log["missing"].append(
-                            a["name"]
-                            + " > "
-                            + c["name"]
-                            + " > "
-                            + asset["name"]
-                            + " : missing formats "
-                            + missing
-                        )
-                    else:
-                        placement_log["need"].append(
-                            a["name"] + " > " + c["name"] + " > " + asset["name"]
-                        )
+                else:
+                    placement_log["need"].append(entry)
     file = open(
         append_date(global_data["local_path"] + os.sep + "AssetDetailsCountReport.txt"),
         "w",
@@ -559,35 +376,27 @@ def generate_detail_report(database):
 
 def generate_folder_report(database):
     console.print("Generating folder report ...")
-    asset_types = database.get_all_asset_types()
     placement_log = []
-    for a in asset_types:  # track(asset_types, description="Types."):
-        categories = database.get_all_categories_by_asset_type_id(a["id"])
-        # if not os.path.exists(global_data["local_path"] + os.sep + a["name"]):
-        #     continue
-        for c in categories:  # track(categories, description="Categories."):
-            assets = database.get_all_assets_by_category(c["id"])
-            # if not os.path.exists(
-            #     global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-            # ):
-            #     continue
-            console.print(f"{a['name']} - {c['name']}")
+    assets_by_category = {}
+    for asset in database.get_assets_with_path():
+        assets_by_category.setdefault(asset["category"], []).append(asset)
+    # categories without assets are listed too
+    for asset_type in database.get_all_asset_types():
+        type_name = asset_type["name"]
+        for category in database.get_all_categories_by_asset_type_id(asset_type["id"]):
+            category_name = category["name"]
+            assets = assets_by_category.get(category["id"], [])
+            console.print(f"{type_name} - {category_name}")
             have = 0
             missing = 0
             for asset in track(assets, description="Assets.", total=len(assets)):
-                if os.path.exists(
-                    global_data["local_path"]
-                    + os.sep
-                    + a["name"]
-                    + os.sep
-                    + c["name"]
-                    + os.sep
-                    + asset["name"]
-                ):
+                if os.path.exists(asset_path(asset)):
                     have = have + 1
                 else:
                     missing = missing + 1
-            placement_log.append(f"{a['name']} - {c['name']} (Have {have}; Missing {missing})")
+            placement_log.append(
+                f"{type_name} - {category_name} (Have {have}; Missing {missing})"
+            )
     file = open(
         append_date(global_data["local_path"] + os.sep + "AssetFolderCountReport.txt"),
         "w",
@@ -601,61 +410,28 @@ def generate_folder_report(database):
 
 def mark_database_with_my_files(database):
     console.print("Checking local files for the database ...")
-    asset_types = database.get_all_asset_types()
-    for a in asset_types:  # track(asset_types, description="Types."):
-        categories = database.get_all_categories_by_asset_type_id(a["id"])
-        if not os.path.exists(global_data["local_path"] + os.sep + a["name"]):
+    # local files of the removed assets are still owned
+    for (type_name, category_name), assets in group_by_category(
+        database.get_assets_with_path(include_removed=True)
+    ):
+        if not os.path.exists(category_path(type_name, category_name)):
             continue
-        for c in categories:  # track(categories, description="Categories."):
-            assets = database.get_all_assets_by_category(c["id"])
-            if not os.path.exists(
-                global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-            ):
-                continue
-            console.print(f"{a['name']} - {c['name']}")
-            for asset in track(assets, description="Assets.", total=len(assets)):
-                if os.path.exists(
-                    global_data["local_path"]
-                    + os.sep
-                    + a["name"]
-                    + os.sep
-                    + c["name"]
-                    + os.sep
-                    + asset["name"]
-                ):
-                    local_path = (
-                        global_data["local_path"]
-                        + os.sep
-                        + a["name"]
-                        + os.sep
-                        + c["name"]
-                        + os.sep
-                        + asset["name"]
-                        + os.sep
-                    )
-                    all_files = []
-                    for lp, currentDirectory, files in os.walk(local_path):
-                        all_files.extend(files)
-                    asset["have_format_sbsar"] = False
-                    asset["have_format_sbs"] = False
-                    asset["have_format_exr"] = False
-                    asset["have_format_fbx"] = False
-                    asset["have_format_glb"] = False
-                    asset["have_format_mdl"] = False
-                    for file in all_files:
-                        if file.lower().endswith(".sbsar") and asset["format_sbsar"]:
-                            asset["have_format_sbsar"] = True
-                        if file.lower().endswith(".sbs") and asset["format_sbs"]:
-                            asset["have_format_sbs"] = True
-                        if file.lower().endswith(".exr") and asset["format_exr"]:
-                            asset["have_format_exr"] = True
-                        if file.lower().endswith(".fbx") and asset["format_fbx"]:
-                            asset["have_format_fbx"] = True
-                        if file.lower().endswith(".glb") and asset["format_glb"]:
-                            asset["have_format_glb"] = True
-                        if file.lower().endswith(".mdl") and asset["format_mdl"]:
-                            asset["have_format_mdl"] = True
-                    database.update_asset(asset)
+        assets = list(assets)
+        console.print(f"{type_name} - {category_name}")
+        for asset in track(assets, description="Assets.", total=len(assets)):
+            if os.path.exists(asset_path(asset)):
+                all_files = []
+                for lp, currentDirectory, files in os.walk(asset_path(asset) + os.sep):
+                    all_files.extend(files)
+                owned = 0
+                for file in all_files:
+                    extension = os.path.splitext(file)[1].lower()[1:]
+                    if extension in ASSET_FORMATS:
+                        owned = owned | (1 << ASSET_FORMATS.index(extension))
+                owned = owned & asset["formats_offered"]
+                for bit, asset_format in enumerate(ASSET_FORMATS):
+                    asset["have_format_" + asset_format] = bool(owned & (1 << bit))
+                database.update_asset(asset)
 
     input("Press any enter to close...")
 
@@ -666,30 +442,18 @@ def fancy_list_generation(database):
     if os.path.exists(global_data["local_path"] + os.sep + "Requests.txt"):
         with open(global_data["local_path"] + os.sep + "Requests.txt") as f:
             base_requests = f.read().splitlines()
+        found_assets = {}
+        for asset in database.get_assets_by_names(base_requests, include_removed=False):
+            if asset["name_key"].lower() not in found_assets:
+                found_assets[asset["name_key"].lower()] = asset
         for base_r in track(
             base_requests, description="Requests.", total=len(base_requests)
         ):
-            asset = database.get_asset_by_name(base_r)
-            if len(asset) > 0:
-                asset_format = ""
-                if asset[0]["format_sbsar"]:
-                    asset_format = asset_format + "sbsar "
-                if asset[0]["format_sbs"]:
-                    asset_format = asset_format + "sbs "
-                if asset[0]["format_exr"]:
-                    asset_format = asset_format + "exr "
-                if asset[0]["format_fbx"]:
-                    asset_format = asset_format + "cbx "
-                if asset[0]["format_glb"]:
-                    asset_format = asset_format + "glb "
-                if asset[0]["format_mdl"]:
-                    asset_format = asset_format + "mdl "
+            asset = found_assets.get(normalize_asset_name(base_r).lower())
+            if asset is not None:
+                asset_format = " ".join(format_names(asset["formats_offered"]))
                 fancy_requests.append(
-                    asset[0]["name"]
-                    + " - "
-                    + asset_format.strip()
-                    + " - "
-                    + asset[0]["url"]
+                    asset["name"] + " - " + asset_format + " - " + asset["url"]
                 )
     if len(fancy_requests) > 0:
         file = open(
@@ -713,60 +477,35 @@ def move_folders_to_new_category(database):
     asset_types = database.get_all_asset_types()
     all_categories = database.get_all_categories()
     log = []
-    for a in asset_types:  # track(asset_types, description="Types."):
-        categories = database.get_all_categories_by_asset_type_id(a["id"])
-        # if not os.path.exists(global_data["local_path"] + os.sep + a["name"]):
-        #     continue
-        for c in categories:  # track(categories, description="Categories."):
-            assets = database.get_all_assets_by_category(c["id"])
-
-            # if not os.path.exists(
-            #     global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-            # ):
-            #     continue
-            console.print(f"{a['name']} - {c['name']}")
-            for asset in track(assets, description="Assets.", total=len(assets)):
-                expected_path = (
-                    global_data["local_path"]
-                    + os.sep
-                    + a["name"]
-                    + os.sep
-                    + c["name"]
-                    + os.sep
-                    + asset["name"]
-                )
-                if not os.path.exists(expected_path):
-                    # we did not find our asset in the right place, so we check everywhere
-                    found = False
-                    for a1 in asset_types:
-                        for c1 in all_categories:
-                            checked_path = (
-                                global_data["local_path"]
-                                + os.sep
-                                + a1["name"]
-                                + os.sep
-                                + c1["name"]
-                                + os.sep
-                                + asset["name"]
-                            )
-                            if checked_path != expected_path and os.path.exists(
-                                checked_path
-                            ):
-                                log.append(checked_path + " >> " + expected_path)
-                                if not os.path.exists(global_data["local_path"] + os.sep + a["name"]):
-                                    os.makedirs(global_data["local_path"] + os.sep + a["name"])
-                                if not os.path.exists(
-                                        global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-                                ):
-                                    os.makedirs(
-                                        global_data["local_path"] + os.sep + a["name"] + os.sep + c["name"]
-                                    )
-
-                                os.rename(checked_path, expected_path)
-                                found = True
-                                break
-                        if found:
+    for (type_name, category_name), assets in group_by_category(
+        database.get_assets_with_path()
+    ):
+        assets = list(assets)
+        console.print(f"{type_name} - {category_name}")
+        for asset in track(assets, description="Assets.", total=len(assets)):
+            expected_path = asset_path(asset)
+            if not os.path.exists(expected_path):
+                # we did not find our asset in the right place, so we check everywhere
+                found = False
+                for a1 in asset_types:
+                    for c1 in all_categories:
+                        checked_path = (
+                            category_path(a1["name"], c1["name"])
+                            + os.sep
+                            + asset["name"]
+                        )
+                        if checked_path != expected_path and os.path.exists(
+                            checked_path
+                        ):
+                            log.append(checked_path + " >> " + expected_path)
+                            if not os.path.exists(category_path(type_name, category_name)):
+                                os.makedirs(category_path(type_name, category_name))
+
+                            os.rename(checked_path, expected_path)
+                            found = True
                             break
+                    if found:
+                        break
     console.print("Moved Assets - " + str(len(log)))
     console.print()
     console.print("All Done !!!")
@@ -784,10 +523,11 @@ def move_folders_to_new_category(database):
     input("Press any enter to close...")
 
 
-def main_menu(database):
+def main_menu(database, report_database):
     """
     Draw main menu
     :param CommonDatabaseAccess database: reference to the database
+    :param CommonDatabaseAccess report_database: read only reference to the same database for reports
     :return:
     """
     menu_title = " Select action"
@@ -828,15 +568,21 @@ def main_menu(database):
             if menu_sel == 6:  # Mark database with my files
                 mark_database_with_my_files(database)
             if menu_sel == 7:  # Generate folder report
-                generate_folder_report(database)
+                generate_folder_report(report_database)
             if menu_sel == 8:  # Generate detail report
-                generate_detail_report(database)
+                generate_detail_report(report_database)
             if menu_sel == 9:  # Fancy list generation
                 fancy_list_generation(database)
             if menu_sel == 10:  # Move folders to new category
                 move_folders_to_new_category(database)
             if menu_sel == 11:  # Quit
                 menu_exit = True
+            if 1 <= menu_sel < 11:
+                for db in (database, report_database):
+                    db.write_profile(
+                        global_data["local_path"] + os.sep + "Profile.jsonl",
+                        menu_items[menu_sel - 1],
+                    )
 
 
 def main():
@@ -844,6 +590,14 @@ def main():
     Check location of the database and then going to main menu
     :return:
     """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Measure database calls, summary of every action is added to Profile.jsonl.",
+    )
+    args = parser.parse_args()
+
     menu_title = " Select database file"
     menu_items = []
     menu_items_count = 0
@@ -864,9 +618,17 @@ def main():
         input("Press any enter to close...")
     elif menu_items_count == 1:
         database = CommonDatabaseAccess(
-            db_path=local_path + os.sep + menu_items_references[0], force=False
+            db_path=local_path + os.sep + menu_items_references[0],
+            force=False,
+            profile=args.profile,
+        )
+        report_database = CommonDatabaseAccess(
+            db_path=local_path + os.sep + menu_items_references[0],
+            force=False,
+            profile=args.profile,
+            read_only=True,
         )
-        main_menu(database)
+        main_menu(database, report_database)
     else:
         menu_exit = False
         while not menu_exit:
@@ -885,8 +647,17 @@ def main():
                         + os.sep
                         + menu_items_references[menu_sel - 1],
                         force=False,
+                        profile=args.profile,
+                    )
+                    report_database = CommonDatabaseAccess(
+                        db_path=local_path
+                        + os.sep
+                        + menu_items_references[menu_sel - 1],
+                        force=False,
+                        profile=args.profile,
+                        read_only=True,
                     )
-                    main_menu(database)
+                    main_menu(database, report_database)
                     menu_exit = True
 
 
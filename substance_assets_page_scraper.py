@@ -2,7 +2,12 @@
 import os
 import time
 import sys
+import queue
+import threading
+import multiprocessing
+import multiprocessing.util
 
+import heapq
 import datetime
 import argparse
 
@@ -13,16 +18,50 @@ from rich.console import Console
 from rich.traceback import install
 from rich.progress import track
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import WebDriverException
 
-from selenium.common.exceptions import StaleElementReferenceException
+from requests.exceptions import RequestException
 
 from common_database_access import CommonDatabaseAccess
+from substance_assets_changeset import (
+    CHANGESET_KINDS,
+    record_asset_changes,
+    load_known_assets,
+    build_changeset,
+    apply_changeset,
+    changeset_report,
+)
+from substance_assets_http_scanner import (
+    ASSETS_ENDPOINT,
+    create_session,
+    fetch_category_cards,
+)
+from substance_assets_snapshot import (
+    save_snapshot,
+    load_snapshot,
+    read_category_cards,
+    read_gallery_images,
+)
+from substance_assets_browser import (
+    START_URL,
+    ASSET_TYPE_SELECTOR,
+    CARD_SELECTOR,
+    GALLERY_SELECTOR,
+    CARD_DATA_SCRIPT,
+    GALLERY_DATA_SCRIPT,
+    ANCHOR_DATA_SCRIPT,
+    get_shared_driver,
+    close_shared_driver,
+    start_browser,
+    get_driver_path,
+    set_timeouts,
+    get_timeouts,
+    wait_for_page,
+    wait_for_visible_images,
+    load_all_cards,
+    load_more_cards,
+    count_missing_images,
+)
 
 from pathlib import Path
 
@@ -30,6 +69,25 @@ console = Console()
 pretty.install()
 install()  # this is for tracing project activity
 global_data = {"version": "Beta 1.3 (22.01.2022)\n"}
+worker_data = {}  # scanner of the category scan worker process
+
+# weights of the detailed scan priority, see detail_check_priority
+DETAIL_PRIORITY = {
+    "need_to_check": 1000,  # marked by the category scan
+    "recent_change": 200,  # changed within recent_days, more changes are likely
+    "recent_days": 7,
+    "empty_details_image": 50,
+    "empty_variant_image": 10,
+    "max_age_days": 365,  # one point per day since last change, up to this
+}
+
+# sections of the category scan report, see changeset_report, and their titles
+REPORT_SECTIONS = (
+    ("new_elements_count", "Added Elements"),
+    ("updated_elements_count", "Updated Elements"),
+    ("changed_category", "Changed Category"),
+    ("removed_elements", "Removed Elements"),
+)
 
 
 def append_date(filename):
@@ -54,54 +112,128 @@ def clear_console():
 
 def page_scrolling_down(driver) -> None:
     """
-    Scrolling down whole page to load all elements
+    Loading all elements of the page.
+    Page is jumped to its bottom until no new cards come within scroll timeout,
+    then thumbnails skipped by the jump get their images, see load_missing_images
     """
+    load_all_cards(driver, CARD_SELECTOR)
+    load_missing_images(driver)
+
+
+def page_scrolling_down_to_known(input_value, driver) -> None:
+    """
+    Loading elements of the page sorted newest first, until a run of known cards.
+    Page is jumped to its bottom like in page_scrolling_down, but after every jump
+    last cards are checked, and loading stops when the last "known_run" cards are all known,
+    see is_known_card
+
+    :param {} input_value: scan state with "asset_class" and "known_cards"
+    :param driver: reference to the Chrome driver
+    """
+    count = 0
+    while True:
+        new_count = load_more_cards(driver, CARD_SELECTOR, count)
+        if new_count <= count:
+            break
+        count = new_count
+        wait_for_visible_images(driver, CARD_SELECTOR)
+        page_data = driver.execute_script(CARD_DATA_SCRIPT, input_value["asset_class"])
+        known_run = 0
+        for card in reversed(page_data["cards"]):
+            if not is_known_card(
+                    input_value, card_from_title_text(card["href"], card["img"], card["text"])
+            ):
+                break
+            known_run = known_run + 1
+        if known_run >= global_data["known_run"]:
+            break
+    load_missing_images(driver)
+
+
+def is_known_card(input_value, card) -> bool:
+    """Card with known link and preview brings no change, unless it is marked as UPDATED,
+    updated assets usually keep their link and preview
+
+    :param {} input_value: scan state with "known_cards"
+    :param {} card: card, see card_from_title_text
+    """
+    return not card["need_update"] and (card["href"], card["image"]) in input_value["known_cards"]
+
+
+def load_missing_images(driver) -> None:
+    """
+    Only if some thumbnails were skipped by the jump without getting their images,
+    page is passed by one screen at a time, waiting for images on the screen
+    """
+    if count_missing_images(driver, CARD_SELECTOR) == 0:
+        return
     scrolling_params = {
-        "last_height": driver.execute_script("return document.body.scrollHeight"),
+        "height": driver.execute_script("return document.body.scrollHeight"),
         "current_pos": 0,
-        "new_height": 0,
+        "step": driver.execute_script("return window.innerHeight") or 200,
     }
-    while True:
-        while scrolling_params["current_pos"] < scrolling_params["last_height"]:
-            driver.execute_script(
-                "window.scrollTo(0, arguments[0]);",
-                scrolling_params["current_pos"],
-            )
-            time.sleep(0.2)
-            scrolling_params["current_pos"] += 200
+    while scrolling_params["current_pos"] < scrolling_params["height"]:
+        driver.execute_script(
+            "window.scrollTo(0, arguments[0]);",
+            scrolling_params["current_pos"],
+        )
+        wait_for_visible_images(driver, CARD_SELECTOR)
+        scrolling_params["current_pos"] += scrolling_params["step"]
+
+
+def group_categories_by_asset_type(anchors, look_up_class) -> []:
+    """Finds asset type and category tabs among all anchors of the page.
+    Tab classes are taken from the first anchors with the reference links,
+    category belongs to the asset type, whose link starts its link
 
-        scrolling_params["new_height"] = driver.execute_script(
-            "return document.body.scrollHeight"
+    :param [] anchors: {"href", "className", "text"} of all anchors, see ANCHOR_DATA_SCRIPT
+    :param {} look_up_class: reference links, found classes are stored in it
+    :return: [(asset type anchor, [category anchors])]
+    """
+    for anchor in anchors:
+        if look_up_class["asset_type_class"] == "" and look_up_class[
+            "asset_type_class_reference"
+        ] in anchor["href"]:
+            look_up_class["asset_type_class"] = anchor["className"]
+        if look_up_class["category_class"] == "" and look_up_class[
+            "category_class_reference"
+        ] in anchor["href"]:
+            look_up_class["category_class"] = anchor["className"]
+
+    asset_type_tabs = []
+    category_tabs = []
+    for anchor in anchors:
+        if (
+                look_up_class["asset_type_class"] != ""
+                and anchor["className"] == look_up_class["asset_type_class"]
+        ):
+            asset_type_tabs.append(anchor)
+        if (
+                look_up_class["category_class"] != ""
+                and anchor["className"] == look_up_class["category_class"]
+        ):
+            category_tabs.append(anchor)
+    return [
+        (
+            tab,
+            [sub_tab for sub_tab in category_tabs if sub_tab["href"].startswith(tab["href"])],
         )
-        if scrolling_params["new_height"] == scrolling_params["last_height"]:
-            break
-        scrolling_params["last_height"] = scrolling_params["new_height"]
+        for tab in asset_type_tabs
+    ]
 
 
 def initial_asset_type_and_category_scan(database, debug):
     """Initial scan of the https://substance3d.adobe.com/assets/allassets
-    to save information about asset type and categories in the sqlite database"""
+    to save information about asset type and categories in the sqlite database.
+    Page is read by one script call, known asset types and categories are looked up in memory
+    and all new ones are written in one transaction"""
 
     # database = CommonDatabaseAccess(db_path=db_path, force=True)
 
-    s = Service(ChromeDriverManager().install())
-    options = webdriver.ChromeOptions()
-    options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    driver = webdriver.Chrome(executable_path=s.path, options=options)
-
-    url = "https://substance3d.adobe.com/assets/allassets"
-
-    driver.get(url)
-    time.sleep(2)
-    # waiting to load cookie popup and dismissing it
-    try:
-        tabs = driver.find_element(By.ID, "onetrust-accept-btn-handler")
-        tabs.click()
-    except NoSuchElementException:
-        print("no popup found")
-
-    time.sleep(1)
-    tabs = driver.find_elements(By.TAG_NAME, "a")
+    driver = get_shared_driver(not global_data["show_browser"])
+    driver.get(START_URL)
+    wait_for_page(driver, ASSET_TYPE_SELECTOR)
+    anchors = driver.execute_script(ANCHOR_DATA_SCRIPT)
 
     new_elements_count = 0  # amount of new elements during scraping
 
@@ -112,71 +244,31 @@ def initial_asset_type_and_category_scan(database, debug):
         "asset_type_class_reference": "/assets/allassets?assetType=substanceMaterial",
         "category_class_reference": "/assets/allassets?assetType=substanceMaterial&category",
     }
+    asset_type_ids = {
+        asset_type["name"]: asset_type["id"] for asset_type in database.get_all_asset_types()
+    }
+    category_ids = {
+        (cat["asset_type"], cat["name"]): cat["id"] for cat in database.get_all_categories()
+    }
 
-    for tab in tabs:
-        category_parameter = {
-            "category": "",
-            "category_url": "",
-            "category_id": 0,
-            "asset_type_name": "",
-            "asset_type_id": 0,
-            "asset_type_records": [],
-            "category_records": [],
-        }
-        if look_up_class["asset_type_class"] == "" and look_up_class[
-            "asset_type_class_reference"
-        ] in tab.get_attribute("href"):
-            look_up_class["asset_type_class"] = tab.get_attribute("class")
-
-        if (
-                look_up_class["asset_type_class"] != ""
-                and tab.get_attribute("class") == look_up_class["asset_type_class"]
-        ):
-            category_parameter["asset_type_name"] = tab.text.split("\n", 1)[0]
-            tab_link = tab.get_attribute("href")
-
-            category_parameter["asset_type_records"] = database.get_asset_type_by_name(
-                category_parameter["asset_type_name"]
-            )
-            if len(category_parameter["asset_type_records"]) == 0:
-                category_parameter["asset_type_id"] = database.set_new_asset_type(
-                    category_parameter["asset_type_name"], tab_link
+    with database.batch_write():
+        for tab, sub_tabs in group_categories_by_asset_type(anchors, look_up_class):
+            asset_type_name = tab["text"].split("\n", 1)[0]
+            if asset_type_name not in asset_type_ids:
+                asset_type_ids[asset_type_name] = database.set_new_asset_type(
+                    asset_type_name, tab["href"]
                 )
-            else:
-                category_parameter["asset_type_id"] = category_parameter[
-                    "asset_type_records"
-                ][0]["id"]
-
-            for sub_tab in tabs:
-                if look_up_class["category_class"] == "" and look_up_class[
-                    "category_class_reference"
-                ] in sub_tab.get_attribute("href"):
-                    look_up_class["category_class"] = sub_tab.get_attribute("class")
-                if (
-                        look_up_class["category_class"] != ""
-                        and sub_tab.get_attribute("class")
-                        == look_up_class["category_class"]
-                        and sub_tab.get_attribute("href").startswith(tab_link)
-                ):
-
-                    category_parameter["category"] = sub_tab.text.split("\n", 1)[0]
-                    category_parameter["category_url"] = sub_tab.get_attribute("href")
-                    if debug:
-                        console.print(category_parameter["category"])
-
-                    category_parameter[
-                        "category_records"
-                    ] = database.get_category_by_name_and_asset_type_id(
-                        category_parameter["category"],
-                        category_parameter["asset_type_id"],
+            asset_type_id = asset_type_ids[asset_type_name]
+
+            for sub_tab in sub_tabs:
+                category = sub_tab["text"].split("\n", 1)[0]
+                if debug:
+                    console.print(category)
+                if (asset_type_id, category) not in category_ids:
+                    new_elements_count = new_elements_count + 1
+                    category_ids[(asset_type_id, category)] = database.set_new_category(
+                        category, sub_tab["href"], asset_type_id
                     )
-                    if len(category_parameter["category_records"]) == 0:
-                        new_elements_count = new_elements_count + 1
-                        category_parameter["category_id"] = database.set_new_category(
-                            category_parameter["category"],
-                            category_parameter["category_url"],
-                            category_parameter["asset_type_id"],
-                        )
 
     console.print()
     if debug:
@@ -187,7 +279,6 @@ def initial_asset_type_and_category_scan(database, debug):
     console.print()
     console.print("All Done !!!")
     input("Press Enter to continue...")
-    driver.close()
 
 
 def draw_asset_type_list_menu(database, debug):
@@ -201,6 +292,10 @@ def draw_asset_type_list_menu(database, debug):
         count = count + 1
     menu_items.append(f"[{count}] All")
     count = count + 1
+    menu_items.append(f"[{count}] All, new and updated only")
+    count = count + 1
+    menu_items.append(f"[{count}] Resume unfinished scan")
+    count = count + 1
     menu_items.append(f"[{count}] Individual Category")
     count = count + 1
     menu_items.append(f"[{count}] Return")
@@ -217,15 +312,20 @@ def draw_asset_type_list_menu(database, debug):
         user_input = input("Enter a number: ")
         if user_input.isnumeric():
             menu_sel = int(user_input)
-            if 1 <= menu_sel < count - 2:  # Specific asset type
+            if 1 <= menu_sel < count - 4:  # Specific asset type
                 categories = database.get_all_categories_by_asset_type_id(
                     all_asset_types[menu_sel - 1]["id"]
                 )
                 asset_scan_by_asset_type(database, debug, categories)
-            elif menu_sel == count - 2:  # all asset types
+            elif menu_sel == count - 4:  # all asset types
                 # categories = database.get_all_categories_by_id(14)
                 categories = database.get_all_categories()
                 asset_scan_by_asset_type(database, debug, categories)
+            elif menu_sel == count - 3:  # all asset types, incremental
+                categories = database.get_all_categories()
+                asset_scan_by_asset_type(database, debug, categories, incremental=True)
+            elif menu_sel == count - 2:  # resume unfinished scan
+                resume_asset_scan(database, debug)
             elif menu_sel == count - 1:  # individual asset types
                 draw_individual_asset_type_list_menu(database, debug)
             elif menu_sel == count:  # Quit
@@ -296,283 +396,677 @@ def get_asset_name_and_format_from_string(title_text) -> []:
     return [name, asset_format.replace(",", "").split(" ")]
 
 
-def single_category_asset_scan(input_value, driver, database, cat, debug) -> None:
-    """Process one category of the assets
+def card_from_title_text(href, image, title_text) -> {}:
+    """Converts data of the asset card from the page to the card used by the category scan
 
-    :param {} input_value: {
-        "new_elements_count": [],
-        "updated_elements_count": [],
-        "asset_class": "",
-        "utc_timestamp": utc_timestamp,
-        "changed_category": []
+    :param str href: link to the asset page
+    :param str image: link to the preview image
+    :param [] title_text: text of the card by lines
+    :return: {"href", "image", "name", "formats", "need_update"}
+    """
+    checked_name = get_asset_name_and_format_from_string(title_text)
+    return {
+        "href": href,
+        "image": image.split("?", 1)[0],
+        "name": checked_name[0],
+        "formats": checked_name[1],
+        "need_update": title_text[0].lower() == "UPDATED".lower(),
     }
+
+
+def category_snapshot_kind(input_value) -> str:
+    """Incremental scan loads only the newest part of the category,
+    so its page is stored apart and never replayed as the whole category"""
+    return "category_newest" if input_value["incremental"] else "category"
+
+
+def collect_category_cards_from_driver(input_value, driver, cat) -> []:
+    """Loads category page in the browser and reads all asset cards from it
+
+    :param {} input_value: scan state, "asset_class" is found on the first page
     :param driver: reference to the Chrome driver
-    :param database: reference to the common_database_access.py
     :param [] cat: category data from SQLite database
-    :param bool debug: show debug info
+    :return: list of cards, see card_from_title_text
     """
-    driver.get(cat["url"])
-    time.sleep(1)
-    page_scrolling_down(driver)
+    if input_value["incremental"]:
+        driver.get(
+            cat["url"] + ("&" if "?" in cat["url"] else "?") + global_data["newest_first_query"]
+        )
+        wait_for_page(driver, CARD_SELECTOR)
+        page_scrolling_down_to_known(input_value, driver)
+    else:
+        driver.get(cat["url"])
+        wait_for_page(driver, CARD_SELECTOR)
+        page_scrolling_down(driver)
+    if global_data["snapshot_dir"]:
+        save_snapshot(
+            global_data["snapshot_dir"],
+            category_snapshot_kind(input_value),
+            cat["url"],
+            driver.page_source,
+        )
 
-    # checking actual elements
-    elements = driver.find_elements(By.TAG_NAME, "div")
-    for element in elements:
-        if input_value[
-            "asset_class"
-        ] == "" and "source-asset-thumbnail" in element.get_attribute("class"):
-            input_value["asset_class"] = element.get_attribute("class")
+    # checking actual elements, all cards are read by one script call
+    page_data = driver.execute_script(CARD_DATA_SCRIPT, input_value["asset_class"])
+    return cards_from_page_data(input_value, page_data)
 
-        if (
-                input_value["asset_class"] != ""
-                and element.get_attribute("class") == input_value["asset_class"]
-        ):
 
-            _a = element.find_element(By.TAG_NAME, "a")
-            href = _a.get_attribute("href")
-            img = element.find_element(By.TAG_NAME, "img")
-            image = img.get_attribute("src").split("?", 1)[0]
-            title_text = element.text.split("\n")
-            need_update = title_text[0].lower() == "UPDATED".lower()
+def collect_category_cards_from_snapshot(input_value, snapshot_dir, cat) -> []:
+    """Reads all asset cards from the stored snapshot of the category page
 
-            checked_name = get_asset_name_and_format_from_string(title_text)
-            if image.startswith("https://"):
-                if debug:
-                    console.print(checked_name[0])
-                ast = database.get_asset_by_url(href)
-                if len(ast) == 0:
-                    ast = database.get_asset_by_name(checked_name[0])
-                if len(ast) == 0:  # element not found, need to add
-                    input_value["new_elements_count"].append(
-                        database.get_asset_type_and_category_name_by_category_id(cat["id"])[1] + " -- " + checked_name[0]
-                    )
-                    database.set_new_asset(
-                        {
-                            "name": checked_name[0],
-                            "url": href,
-                            "category": cat["id"],
-                            "preview_image": image,
-                            "details_image": "",
-                            "variant_1_image": "",
-                            "variant_2_image": "",
-                            "variant_3_image": "",
-                            "have_preview_image_changed": False,
-                            "have_details_image_changed": False,
-                            "have_variant_1_image_changed": False,
-                            "have_variant_2_image_changed": False,
-                            "have_variant_3_image_changed": False,
-                            "last_change_date": input_value["utc_timestamp"],
-                            "need_to_check": True,
-                            "format_sbsar": "SBSAR" in checked_name[1],
-                            "format_sbs": "SBS" in checked_name[1],
-                            "format_exr": "EXR" in checked_name[1],
-                            "format_fbx": "FBX" in checked_name[1],
-                            "format_glb": "GLB" in checked_name[1],
-                            "format_mdl": "MDL" in checked_name[1],
-                            "have_format_sbsar": False,
-                            "have_format_sbs": False,
-                            "have_format_exr": False,
-                            "have_format_fbx": False,
-                            "have_format_glb": False,
-                            "have_format_mdl": False,
-                        }
-                    )
-                else:  # checking by url, since can have duplicate names
-                    if (
-                            ast[0]["preview_image"] != image
-                            or need_update
-                            or ast[0]["name"] != checked_name[0]
-                            or ast[0]["category"] != cat["id"]
-                    ):
-
-                        if ast[0]["category"] != cat["id"]:
-                            input_value["changed_category"].append(
-                                checked_name[0]
-                                + " -- *From* "
-                                + database.get_asset_type_and_category_name_by_category_id(
-                                    ast[0]["category"]
-                                )[
-                                    1
-                                ]
-                                + " *To* "
-                                + database.get_asset_type_and_category_name_by_category_id(
-                                    cat["id"]
-                                )[
-                                    1
-                                ]
-                            )
-                        else:
-                            input_value["updated_elements_count"].append(
-                                database.get_asset_type_and_category_name_by_category_id(cat["id"])[1] + " -- " + checked_name[0]
-                            )
-
-                        ast[0]["name"] = checked_name[0]
-                        ast[0]["url"] = href
-                        ast[0]["category"] = cat["id"]
-                        ast[0]["preview_image"] = image
-                        ast[0]["have_preview_image_changed"] = True
-                        ast[0]["last_change_date"] = input_value["utc_timestamp"]
-                        ast[0]["need_to_check"] = True
-                    ast[0]["format_sbsar"] = "SBSAR" in checked_name[1]
-                    ast[0]["format_sbs"] = "SBS" in checked_name[1]
-                    ast[0]["format_exr"] = "EXR" in checked_name[1]
-                    ast[0]["format_fbx"] = "FBX" in checked_name[1]
-                    ast[0]["format_glb"] = "GLB" in checked_name[1]
-                    ast[0]["format_mdl"] = "MDL" in checked_name[1]
-                    database.update_asset(ast[0])
-
-
-def asset_scan_by_asset_type(database, debug, categories):
+    :param {} input_value: scan state, "asset_class" is found on the first page
+    :param str snapshot_dir: folder with snapshots
+    :param [] cat: category data from SQLite database
+    :return: list of cards, see card_from_title_text
+    :raises FileNotFoundError: when there is no snapshot of the category
+    """
+    page_source = load_snapshot(snapshot_dir, category_snapshot_kind(input_value), cat["url"])
+    if page_source is None and input_value["incremental"]:
+        # full page has all the newest cards too
+        page_source = load_snapshot(snapshot_dir, "category", cat["url"])
+    if page_source is None:
+        # missing page is a failed category, not an empty one
+        raise FileNotFoundError(f"No snapshot of {cat['name']} page")
+    page_data = read_category_cards(page_source, cat["url"], input_value["asset_class"])
+    return cards_from_page_data(input_value, page_data)
+
+
+def cards_from_page_data(input_value, page_data) -> []:
+    """Converts cards read from the category page, see CARD_DATA_SCRIPT
+
+    :param {} input_value: scan state, found "asset_class" is stored in it
+    :param {} page_data: {"assetClass", "cards": [{"href", "img", "text"}]}
+    :return: list of cards, see card_from_title_text
+    """
+    input_value["asset_class"] = page_data["assetClass"]
+    return [
+        card_from_title_text(card["href"], card["img"], card["text"])
+        for card in page_data["cards"]
+    ]
+
+
+def collect_category_cards(input_value, scanner, cat) -> []:
+    """Reads all asset cards of the category with the scanner backend
+
+    :param {} input_value: scan state
+    :param {} scanner: {"driver": Chrome driver}, {"session": requests session, "endpoint": url}
+        or {"snapshot_dir": folder with snapshots}
+    :param [] cat: category data from SQLite database
+    :return: list of cards, see card_from_title_text
+    """
+    if "session" in scanner:
+        return fetch_category_cards(scanner["session"], scanner["endpoint"], cat["url"])
+    if "snapshot_dir" in scanner:
+        return collect_category_cards_from_snapshot(input_value, scanner["snapshot_dir"], cat)
+    return collect_category_cards_from_driver(input_value, scanner["driver"], cat)
+
+
+def asset_scan_by_asset_type(database, debug, categories, incremental=False, pause=True):
     """Initial scan of the https://substance3d.adobe.com/assets/allassets
-    to save information about asset in the sqlite database"""
+    to save information about asset in the sqlite database.
+    With --http-endpoint cards are read over plain HTTP, without browser,
+    with --replay cards are read from the stored snapshots.
+    Incremental scan loads categories newest first and stops at a run of known cards,
+    only new and changed cards are processed, so moved and removed assets
+    are found only by the full scan.
+    State of every category is stored, so the scan can be continued by resume_asset_scan.
+    Returns the applied changeset, see build_changeset"""
 
     # database = CommonDatabaseAccess(db_path=db_path, force=True)
-    s = Service(ChromeDriverManager().install())
-    options = webdriver.ChromeOptions()
-    options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    driver = webdriver.Chrome(executable_path=s.path, options=options)
+    scan_id = database.set_new_scan(datetime.datetime.utcnow(), incremental)
+    database.set_scan_categories(scan_id, [cat["id"] for cat in categories])
+    return run_category_scan(database, debug, scan_id, incremental, pause)
+
+
+def resume_asset_scan(database, debug):
+    """Continues the last unfinished scan by Asset type,
+    categories that were not done are scanned and failed ones are tried again"""
+    scan = database.get_unfinished_scan()
+    if scan is None:
+        console.print("There is no unfinished scan")
+        input("Press Enter to continue...")
+        return
+    console.print(f"Resuming scan started {scan['started']}")
+    run_category_scan(database, debug, scan["id"], scan["incremental"])
+
+
+def create_scanner() -> {}:
+    """Backend for reading the cards selected by the command line, see collect_category_cards"""
+    if global_data["replay"]:
+        return {"snapshot_dir": global_data["snapshot_dir"]}
+    if global_data["http_endpoint"]:
+        return {"session": create_session(), "endpoint": global_data["http_endpoint"]}
+    return {"driver": get_shared_driver(not global_data["show_browser"])}
+
+
+def collect_categories_in_sequence(input_value, categories):
+    """Reads cards of the categories one by one in this process
+
+    :param {} input_value: scan state
+    :param [] categories: categories to read
+    :return: yields (category, cards, error text or None)
+    """
+    scanner = create_scanner()
+    for cat in categories:
+        try:
+            yield cat, collect_category_cards(input_value, scanner, cat), None
+        except (WebDriverException, RequestException, OSError) as _e:
+            yield cat, [], str(_e)
 
-    url = "https://substance3d.adobe.com/assets/allassets"
 
-    driver.get(url)
-    time.sleep(2)
-    # waiting to load cookie popup and dismissing it
+def init_category_worker(settings, timeouts, input_value) -> None:
+    """Initializer of the category scan worker process, starts its own scanner.
+    Chrome of the worker is closed when the worker process ends
+
+    :param {} settings: global_data of the main process
+    :param () timeouts: wait and scroll timeouts
+    :param {} input_value: "asset_class", "incremental" and "known_cards" of the scan
+    """
+    global_data.update(settings)
+    set_timeouts(*timeouts)
+    worker_data["input_value"] = input_value
+    if global_data["replay"] or global_data["http_endpoint"]:
+        worker_data["scanner"] = create_scanner()
+    else:
+        worker_data["scanner"] = {
+            "driver": start_browser(
+                not global_data["show_browser"], global_data["driver_path"]
+            )
+        }
+        multiprocessing.util.Finalize(
+            None, worker_data["scanner"]["driver"].quit, exitpriority=10
+        )
+
+
+def collect_category_in_worker(cat):
+    """Reads cards of one category in the worker process
+
+    :param [] cat: category data from SQLite database
+    :return: (category, cards, error text or None)
+    """
     try:
-        tabs = driver.find_element(By.ID, "onetrust-accept-btn-handler")
-        tabs.click()
-    except NoSuchElementException:
-        print("no popup found")
+        cards = collect_category_cards(
+            worker_data["input_value"], worker_data["scanner"], cat
+        )
+    except (WebDriverException, RequestException, OSError) as _e:
+        return cat, [], str(_e)
+    return cat, cards, None
 
+
+def collect_categories_in_parallel(input_value, categories, processes):
+    """Reads cards of the categories in worker processes, every worker has its own Chrome.
+    Results come in the order of categories, so processing and report do not depend on timing.
+    When the results are not used up, the workers are terminated
+
+    :param {} input_value: scan state
+    :param [] categories: categories to read
+    :param int processes: amount of worker processes
+    :return: yields (category, cards, error text or None)
+    """
+    if not global_data["replay"] and not global_data["http_endpoint"]:
+        global_data["driver_path"] = get_driver_path()  # installed once, before the workers
+    pool = multiprocessing.Pool(
+        processes,
+        initializer=init_category_worker,
+        initargs=(
+            dict(global_data),
+            get_timeouts(),
+            {
+                "asset_class": input_value["asset_class"],
+                "incremental": input_value["incremental"],
+                "known_cards": input_value["known_cards"],
+            },
+        ),
+    )
+    try:
+        yield from pool.imap(collect_category_in_worker, categories)
+    except BaseException:
+        # consumer stopped early (error, Ctrl-C or closed generator),
+        # remaining categories are not scraped
+        pool.terminate()
+        raise
+    # all results are used, close and join, so workers end normally and quit their Chrome
+    pool.close()
+    pool.join()
+
+
+def run_category_scan(database, debug, scan_id, incremental, pause=True):
+    """Scans all not collected categories of the scan.
+    With --processes categories are read by parallel worker processes.
+    Cards of every read category are stored at once and the category is marked as collected,
+    so resume reads only the categories, that were not collected.
+    Then cards of all collected categories are compared with the catalog at once,
+    see build_changeset, and the changeset is written in one transaction
+    together with its change events, report entries and done states of the categories.
+    Failed category is only marked as failed and tried again on resume.
+    Assets are marked as removed only when all categories were read by the full scan,
+    never from the category without cards, and not when the category lost more than
+    --max-removed-share of its assets.
+    Without pause it does not wait for Enter at the end, so it can run unattended
+    :return: applied changeset, see build_changeset"""
     utc_timestamp = datetime.datetime.utcnow()
     input_value = {
-        "new_elements_count": [],
-        "updated_elements_count": [],
         "asset_class": "",
         "utc_timestamp": utc_timestamp,
-        "changed_category": [],
+        "scan_id": scan_id,
+        "changes": [],
+        "incremental": incremental,
+        "known_cards": database.get_known_asset_cards() if incremental else set(),
     }
-    for cat in categories:
-        try:  # sub element class name, like Ceramics
-
-            single_category_asset_scan(input_value, driver, database, cat, debug)
-
-        except StaleElementReferenceException:
-            console.print("Exited with Errors !!!")
-            break
-
-    console.print("New elements - " + str(len(input_value["new_elements_count"])))
-    console.print("Updated elements - " + str(len(input_value["updated_elements_count"])))
-    console.print("Changed category - " + str(len(input_value["changed_category"])))
+    load_known_assets(input_value, database)
+    categories = database.get_scan_categories(
+        scan_id, ("pending", "in_progress", "failed")
+    )
+    with database.batch_write():
+        for cat in categories:
+            database.set_scan_category_state(scan_id, cat["id"], "in_progress", utc_timestamp)
+    if global_data["processes"] > 1 and len(categories) > 1:
+        collected = collect_categories_in_parallel(
+            input_value, categories, min(global_data["processes"], len(categories))
+        )
+    else:
+        collected = collect_categories_in_sequence(input_value, categories)
+    failed_count = 0
+    try:
+        for cat, cards, error in collected:
+            if error is not None:
+                failed_count = failed_count + 1
+                console.print(f"{cat['name']} failed, it will be tried again on resume")
+                database.set_scan_category_state(
+                    scan_id, cat["id"], "failed", datetime.datetime.utcnow(), error
+                )
+                continue
+            with database.batch_write():
+                database.set_scan_category_cards(scan_id, cat["id"], cards)
+                database.set_scan_category_state(
+                    scan_id, cat["id"], "collected", datetime.datetime.utcnow()
+                )
+    finally:
+        collected.close()  # parallel workers are stopped at once, when the loop failed
+
+    # cards of the done categories were applied before resume, they are kept until
+    # the scan is finished, so assets found there are not taken as removed
+    stored_cards = database.get_scan_category_cards(scan_id)
+    scan_categories = database.get_scan_categories(scan_id)
+    category_cards = []
+    applied_cards = []
+    for cat in scan_categories:
+        cards = stored_cards.get(cat["id"], [])
+        if cat["state"] == "done":
+            applied_cards.append((cat, cards))
+        elif cat["state"] == "collected":
+            if incremental:  # only new and changed cards are compared
+                cards = [card for card in cards if not is_known_card(input_value, card)]
+            category_cards.append((cat, cards))
+
+    # removed assets could be moved to the category, that was not read,
+    # and empty category is rather a broken page, than removal of all its assets
+    complete_ids = set()
+    if (
+            not incremental
+            and len(scan_categories) == len(input_value["category_names"])
+            and all(cat["state"] in ("collected", "done") for cat in scan_categories)
+    ):
+        complete_ids = {
+            cat["id"] for cat, cards in category_cards + applied_cards if len(cards) > 0
+        }
+    changeset = build_changeset(
+        input_value,
+        category_cards,
+        complete_ids,
+        applied_cards,
+        global_data["max_removed_share"],
+    )
+    for skipped in changeset["removal_skipped"]:
+        console.print(
+            f"{input_value['category_names'][skipped['category']]} lost {skipped['missing']} "
+            f"of {skipped['known']} assets, they are not marked as removed"
+        )
+    if debug:
+        for kind in CHANGESET_KINDS:
+            for entry in changeset[kind]:
+                console.print(kind + " -- " + (entry["card"] or entry["asset"])["name"])
+    report = changeset_report(changeset, input_value["category_names"])
+    try:
+        with database.batch_write():
+            apply_changeset(database, input_value, changeset)
+            for section, _ in REPORT_SECTIONS:
+                database.set_new_scan_report_entries(scan_id, section, report[section])
+            for cat, _ in category_cards:
+                database.set_scan_category_state(
+                    scan_id, cat["id"], "done", datetime.datetime.utcnow()
+                )
+            if failed_count == 0:
+                database.delete_scan_category_cards(scan_id)
+                database.set_scan_finished(scan_id, datetime.datetime.utcnow())
+    finally:
+        input_value["changes"] = []
+
+    report = database.get_scan_report(scan_id)
+    console.print("New elements - " + str(len(report.get("new_elements_count", []))))
+    console.print("Updated elements - " + str(len(report.get("updated_elements_count", []))))
+    console.print("Changed category - " + str(len(report.get("changed_category", []))))
+    console.print("Removed elements - " + str(len(report.get("removed_elements", []))))
     console.print()
+    if failed_count > 0:
+        console.print(f"Failed categories - {failed_count}, use Resume to scan them again")
     console.print("All Done !!!")
-    if len(input_value["changed_category"]) > 0 or len(input_value["new_elements_count"]) > 0 or len(
-            input_value["updated_elements_count"]) > 0:
+    if len(report) > 0:
         file = open(
             append_date(global_data["local_path"] + os.sep + "Scan Report.txt"),
             "w",
             encoding="utf-8",
         )
-        if len(input_value["new_elements_count"]) > 0:
-            file.write("Added Elements:\n\n")
-            for f in input_value["new_elements_count"]:
-                file.write(f + "\n")
-            file.write("\n")
-        if len(input_value["updated_elements_count"]) > 0:
-            file.write("Updated Elements:\n\n")
-            for f in input_value["updated_elements_count"]:
-                file.write(f + "\n")
-            file.write("\n")
-        if len(input_value["changed_category"]) > 0:
-            file.write("Changed Category:\n\n")
-            for f in input_value["changed_category"]:
-                file.write(f + "\n")
-            file.write("\n")
+        for section, title in REPORT_SECTIONS:
+            if len(report.get(section, [])) > 0:
+                file.write(title + ":\n\n")
+                for f in report[section]:
+                    file.write(f + "\n")
+                file.write("\n")
         file.close()
-    input("Press Enter to continue...")
-    driver.close()
+    if pause:
+        input("Press Enter to continue...")
+    return changeset
 
 
-def detailed_scan(database):
-    """Detailed scan of all not previously not checked assets
-    to get references to the variant images"""
-    # database = CommonDatabaseAccess(db_path=db_path, force=True)
+def read_asset_details(driver, asset, utc_timestamp) -> bool:
+    """Opens asset page and reads links to the details and variant images into asset
 
-    s = Service(ChromeDriverManager().install())
-    options = webdriver.ChromeOptions()
-    options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    driver = webdriver.Chrome(executable_path=s.path, options=options)
-    # driver.maximize_window()
+    :param driver: reference to the Chrome driver
+    :param {} asset: asset data from SQLite database, it is updated in place
+    :param datetime utc_timestamp: time of the scan
+    :return: False if the page was not loaded, asset stays marked for the check
+    """
+    driver.get(asset["url"])
+    if not wait_for_page(driver, GALLERY_SELECTOR):
+        return False
+    if global_data["snapshot_dir"]:
+        save_snapshot(global_data["snapshot_dir"], "asset", asset["url"], driver.page_source)
+    # view = driver.find_element(By.CLASS_NAME, 'sc-hKiEVl iEOpyR')  # for some reason not working
+    # so gallery is read by one script call
+    images = driver.execute_script(GALLERY_DATA_SCRIPT, 'sc-hKiEVl iEOpyR')
+    return apply_gallery_images(asset, images, utc_timestamp)
+
+
+def read_asset_details_from_snapshot(snapshot_dir, asset, utc_timestamp) -> bool:
+    """Reads links to the details and variant images into asset from the stored asset page
+
+    :param str snapshot_dir: folder with snapshots
+    :param {} asset: asset data from SQLite database, it is updated in place
+    :param datetime utc_timestamp: time of the scan
+    :return: False if there is no snapshot of the page, asset stays marked for the check
+    """
+    page_source = load_snapshot(snapshot_dir, "asset", asset["url"])
+    if page_source is None:
+        return False
+    images = read_gallery_images(page_source, asset["url"], 'sc-hKiEVl iEOpyR')
+    return apply_gallery_images(asset, images, utc_timestamp)
+
+
+def apply_gallery_images(asset, images, utc_timestamp) -> bool:
+    """Stores links of the asset page gallery into asset
+
+    :param {} asset: asset data from SQLite database, it is updated in place
+    :param [] images: [{"src", "className"}] of the gallery, see GALLERY_DATA_SCRIPT
+    :param datetime utc_timestamp: time of the scan
+    :return: False if the page had no gallery
+    """
+    if images is None:
+        return False
+
+    variant_id = 1
+    found_details_image = False
+    for image in images:
+        link = image["src"].split("?", 1)[0]
+        if (
+                link == asset["preview_image"]
+        ):  # we don't need the preview image, we already have it
+            # but we mark it as checked, since there is some materials, that do not have extra images
+            asset["last_change_date"] = utc_timestamp
+            asset["need_to_check"] = False
+            continue
+        if "sixteen-by-nine" in image["className"]:
+            if asset["details_image"] != link and not found_details_image:
+                found_details_image = True
+                if asset["details_image"] != "":
+                    asset["have_details_image_changed"] = True
+                asset["details_image"] = link
+        else:
+            if (
+                    f"variant_{variant_id}_image" in asset
+                    and asset[f"variant_{variant_id}_image"] != link
+            ):
+                if asset[f"variant_{variant_id}_image"] != "":
+                    asset[f"have_variant_{variant_id}_image_changed"] = True
+                asset[f"variant_{variant_id}_image"] = link
+            variant_id = variant_id + 1
+        asset["last_change_date"] = utc_timestamp
+        asset["need_to_check"] = False
+    return True
+
+
+def detail_check_priority(asset, now) -> int:
+    """Value of checking the asset page now, higher is checked first.
+    Assets marked by the category scan come first, then recently changed ones,
+    assets with empty details and variant images and assets not changed for a long time
+
+    :param {} asset: asset data with "last_event", see get_assets_for_detail_check
+    :param datetime now: UTC time of the scan
+    :return: priority
+    """
+    priority = 0
+    if asset["need_to_check"]:
+        priority = priority + DETAIL_PRIORITY["need_to_check"]
+    if (
+            asset["last_event"] is not None
+            and (now - asset["last_event"]).days < DETAIL_PRIORITY["recent_days"]
+    ):
+        priority = priority + DETAIL_PRIORITY["recent_change"]
+    if not asset["details_image"]:
+        priority = priority + DETAIL_PRIORITY["empty_details_image"]
+    for variant_id in range(1, 4):
+        if not asset[f"variant_{variant_id}_image"]:
+            priority = priority + DETAIL_PRIORITY["empty_variant_image"]
+    if asset["last_change_date"] is None:
+        priority = priority + DETAIL_PRIORITY["max_age_days"]
+    else:
+        priority = priority + min(
+            (now - asset["last_change_date"]).days, DETAIL_PRIORITY["max_age_days"]
+        )
+    return priority
+
+
+def schedule_detail_checks(assets, now, limit=0) -> []:
+    """Orders assets by detail_check_priority with priority queue
+
+    :param [] assets: candidates, see get_assets_for_detail_check
+    :param datetime now: UTC time of the scan
+    :param int limit: amount of assets to check, 0 for all
+    :return: assets to check, the most valuable first
+    """
+    heap = [(-detail_check_priority(asset, now), asset["id"], asset) for asset in assets]
+    heapq.heapify(heap)
+    count = len(heap) if limit <= 0 else min(limit, len(heap))
+    return [heapq.heappop(heap)[2] for _ in range(count)]
 
-    url = "https://substance3d.adobe.com/assets/allassets"
 
-    driver.get(url)
-    time.sleep(2)
-    # waiting to load cookie popup and dismissing it
+def within_deadline(assets, deadline):
+    """Yields assets until the deadline
+
+    :param [] assets: assets to check
+    :param float deadline: time.monotonic() value, None for no deadline
+    """
+    for asset in assets:
+        if deadline is not None and time.monotonic() > deadline:
+            return
+        yield asset
+
+
+def read_asset_details_or_fail(driver, asset, utc_timestamp) -> bool:
+    """Same as read_asset_details, but page load timeout or browser error only fails the asset
+
+    :return: True if the page was read
+    """
+    try:
+        return read_asset_details(driver, asset, utc_timestamp)
+    except WebDriverException:
+        return False
+
+
+def read_details_in_sequence(driver, assets, utc_timestamp, deadline=None):
+    """Reads asset pages one by one in the shared Chrome and yields (asset, loaded)
+
+    :param driver: reference to the Chrome driver
+    :param [] assets: assets to check, they are taken in the given order
+    :param datetime utc_timestamp: time of the scan
+    :param float deadline: time.monotonic() value, after which no new asset is taken
+    """
+    for asset in within_deadline(assets, deadline):
+        yield asset, read_asset_details_or_fail(driver, asset, utc_timestamp)
+
+
+def detail_worker(tasks, results, utc_timestamp, headless, deadline=None) -> None:
+    """Browser worker of the parallel detailed scan, runs in its own thread with its own Chrome.
+    Takes assets from tasks until None or the deadline, and puts (asset, loaded) into results.
+    None is put into results when the worker is finished
+
+    :param queue.Queue tasks: assets to check
+    :param queue.Queue results: checked assets for the database writer
+    :param datetime utc_timestamp: time of the scan
+    :param bool headless: run Chrome without visible window
+    :param float deadline: time.monotonic() value, after which no new asset is taken
+    """
+    driver = None
     try:
-        popup = driver.find_element(By.ID, "onetrust-accept-btn-handler")
-        popup.click()
-    except NoSuchElementException:
-        print("no popup found")
+        driver = start_browser(headless, get_driver_path())
+        while deadline is None or time.monotonic() <= deadline:
+            asset = tasks.get()
+            if asset is None:
+                break
+            results.put((asset, read_asset_details_or_fail(driver, asset, utc_timestamp)))
+    finally:
+        if driver is not None:
+            driver.quit()
+        results.put(None)
+
+
+def read_details_in_parallel(assets, utc_timestamp, workers, deadline=None):
+    """Distributes assets across browser workers and yields (asset, loaded) as they are checked
+
+    :param [] assets: assets to check, they are taken in the given order
+    :param datetime utc_timestamp: time of the scan
+    :param int workers: amount of parallel Chrome sessions
+    :param float deadline: time.monotonic() value, after which no new asset is taken
+    """
+    tasks = queue.Queue()
+    for asset in assets:
+        tasks.put(asset)
+    for _ in range(workers):
+        tasks.put(None)
+    results = queue.Queue()
+    get_driver_path()  # driver is installed once, before the workers start
+    threads = [
+        threading.Thread(
+            target=detail_worker,
+            args=(
+                tasks, results, utc_timestamp, not global_data["show_browser"], deadline
+            ),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    finished = 0
+    while finished < workers:
+        result = results.get()
+        if result is None:
+            finished = finished + 1
+            continue
+        yield result
+    for thread in threads:
+        thread.join()
+
+
+def write_detail_batch(database, input_value, assets) -> None:
+    """Writes checked assets and their change events in one transaction
+
+    :param CommonDatabaseAccess database: reference to the database
+    :param {} input_value: scan state with queued "changes"
+    :param [] assets: checked assets, list is emptied
+    """
+    with database.batch_write():
+        database.update_assets(assets)
+        database.set_new_asset_changes(input_value["changes"])
+    input_value["changes"] = []
+    assets.clear()
+
+
+def detailed_scan(database):
+    """Detailed scan of all not previously not checked assets
+    to get references to the variant images.
+    With more than one worker asset pages are read by parallel Chrome sessions,
+    all results are written by this thread in batches.
+    With --replay asset pages are read from the stored snapshots.
+    Assets are checked by priority, see detail_check_priority. Without budget only assets
+    marked by the category scan are checked, with --detail-budget or --detail-minutes
+    all assets are candidates and the most valuable are checked within the budget"""
+    # database = CommonDatabaseAccess(db_path=db_path, force=True)
 
-    time.sleep(1)
     utc_timestamp = datetime.datetime.utcnow()
-    for asset in track(
-            list(database.get_all_assets_for_check()),
-            description="Assets that need to be checked",
-    ):
-        driver.get(asset["url"])
-        time.sleep(10)
-        # driver.implicitly_wait(20)
-        # view = driver.find_element(By.CLASS_NAME, 'sc-hKiEVl iEOpyR')  # for some reason not working
-        # so we are using manual plan B
-        test = driver.find_elements(By.TAG_NAME, "div")
-        for t in test:
-            try:
-                if t.get_attribute("class") == 'sc-hKiEVl iEOpyR':
-                    view = t
-                    break
-            except NoSuchElementException:
-                console.print()
-
-        divs = view.find_elements(By.TAG_NAME, "div")
-        variant_id = 1
-        found_details_image = False
-        for div in divs:
-            try:
-                img = div.find_element(By.TAG_NAME, 'img')
-            except NoSuchElementException:
-                continue
-            link = img.get_attribute("src").split("?", 1)[0]
-            if (
-                    link == asset["preview_image"]
-            ):  # we don't need the preview image, we already have it
-                # but we mark it as checked, since there is some materials, that do not have extra images
-                asset["last_change_date"] = utc_timestamp
-                asset["need_to_check"] = False
+    input_value = {
+        "utc_timestamp": utc_timestamp,
+        "scan_id": database.set_new_scan(utc_timestamp),
+        "changes": [],
+    }
+    deadline = None
+    if global_data["detail_minutes"] > 0:
+        deadline = time.monotonic() + global_data["detail_minutes"] * 60
+    assets = schedule_detail_checks(
+        database.get_assets_for_detail_check(
+            only_flagged=global_data["detail_budget"] <= 0 and deadline is None
+        ),
+        utc_timestamp,
+        global_data["detail_budget"],
+    )
+    if global_data["replay"]:
+        details = (
+            (
+                asset,
+                read_asset_details_from_snapshot(
+                    global_data["snapshot_dir"], asset, utc_timestamp
+                ),
+            )
+            for asset in within_deadline(assets, deadline)
+        )
+    elif global_data["workers"] > 1:
+        details = read_details_in_parallel(
+            assets, utc_timestamp, global_data["workers"], deadline
+        )
+    else:
+        details = read_details_in_sequence(
+            get_shared_driver(not global_data["show_browser"]), assets, utc_timestamp, deadline
+        )
+    checked = []
+    try:
+        for asset, loaded in track(
+                details, total=len(assets), description="Assets that need to be checked"
+        ):
+            if not loaded:
+                console.print(f"Page of {asset['name']} was not loaded in time")
                 continue
-            if "sixteen-by-nine" in div.get_attribute("class"):
-                if asset["details_image"] != link and not found_details_image:
-                    found_details_image = True
-                    if asset["details_image"] != "":
-                        asset["have_details_image_changed"] = True
-                    asset["details_image"] = link
-            else:
-                if (
-                        f"variant_{variant_id}_image" in asset
-                        and asset[f"variant_{variant_id}_image"] != link
-                ):
-                    if asset[f"variant_{variant_id}_image"] != "":
-                        asset[f"have_variant_{variant_id}_image_changed"] = True
-                    asset[f"variant_{variant_id}_image"] = link
-                variant_id = variant_id + 1
-            asset["last_change_date"] = utc_timestamp
-            asset["need_to_check"] = False
-        database.update_asset(asset)
+            record_asset_changes(input_value, asset)
+            checked.append(asset)
+            if len(checked) >= global_data["write_batch_size"]:
+                write_detail_batch(database, input_value, checked)
+    finally:
+        # assets checked before an error or Ctrl-C are not lost
+        write_detail_batch(database, input_value, checked)
+    database.set_scan_finished(input_value["scan_id"], datetime.datetime.utcnow())
 
     console.print()
     console.print("All Done !!!")
     input("Press Enter to continue...")
-    driver.close()
 
 
 def check_asset_count(database):
@@ -585,6 +1079,92 @@ def check_asset_count(database):
     input("Press Enter to continue...")
 
 
+def add_scan_arguments(parser) -> None:
+    """Adds command line arguments of the category scan,
+    they are shared by all entry points that scan, see apply_scan_arguments
+
+    :param argparse.ArgumentParser parser: parser of the entry point
+    """
+    parser.add_argument(
+        "--show-browser",
+        action="store_true",
+        help="Run Chrome with visible window instead of headless.",
+    )
+    parser.add_argument(
+        "--http-endpoint",
+        default="",
+        help="Read category listings from this GraphQL endpoint over plain HTTP instead of Chrome, "
+             f"the asset library uses {ASSETS_ENDPOINT}",
+    )
+    parser.add_argument(
+        "--wait-timeout",
+        type=float,
+        default=20,
+        help="Seconds to wait for a page to render. (Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--scroll-timeout",
+        type=float,
+        default=3,
+        help="Seconds to wait for more assets after scrolling. (Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        default="",
+        help="Store every scanned category and asset page gzipped into this folder.",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Read category and asset pages from --snapshot-dir instead of Chrome.",
+    )
+    parser.add_argument(
+        "--newest-first-query",
+        default="sortBy=newest",
+        help="Query added to the category url to sort it newest first for the incremental scan. "
+             "(Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--known-run",
+        type=int,
+        default=24,
+        help="Incremental scan stops loading category after this many known cards in a row. "
+             "(Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--max-removed-share",
+        type=float,
+        default=0.25,
+        help="Assets of the category are not marked as removed, when the full scan "
+             "misses more than this share of them. (Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Worker processes reading categories in parallel during Asset scan. (Default is %(default)s)",
+    )
+
+
+def apply_scan_arguments(args) -> None:
+    """Stores parsed arguments of the category scan in global_data and sets the timeouts
+
+    :param argparse.Namespace args: arguments parsed by the parser from add_scan_arguments
+    :raises ValueError: when the arguments do not fit together
+    """
+    if args.replay and not args.snapshot_dir:
+        raise ValueError("--replay needs --snapshot-dir")
+    set_timeouts(args.wait_timeout, args.scroll_timeout)
+    global_data["http_endpoint"] = args.http_endpoint
+    global_data["show_browser"] = args.show_browser
+    global_data["processes"] = max(1, args.processes)
+    global_data["snapshot_dir"] = args.snapshot_dir
+    global_data["replay"] = args.replay
+    global_data["newest_first_query"] = args.newest_first_query
+    global_data["known_run"] = max(1, args.known_run)
+    global_data["max_removed_share"] = max(0.0, args.max_removed_share)
+
+
 def main():
     """Main menu to select desired activity
     Initial scan - checks  https://substance3d.adobe.com/assets/allassets for all assets present
@@ -596,25 +1176,71 @@ def main():
         "-d",
         "--database",
         default="all_assets.db",
-        help="Path to the SQLite file. (Default is %(default)s",
+        help="Path to the SQLite file. (Default is %(default)s)",
     )
     # parser.add_argument(
     #     "-c",
     #     "--chrome-driver",
     #     default=r"C:\going_headless\chromedriver.exe",
-    #     help="Path to the chrome driver file. (Default is %(default)s",
+    #     help="Path to the chrome driver file. (Default is %(default)s)",
     # )
     parser.add_argument(
         "--debug", action="store_true", help="Display extra information while working."
     )
+    parser.add_argument(
+        "--wal",
+        action="store_true",
+        help="Open database in WAL mode, so it can be shared by parallel workers.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Measure database calls, summary of every action is added to Profile.jsonl.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Chrome sessions reading asset pages in parallel during Detailed scan. (Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--write-batch-size",
+        type=int,
+        default=50,
+        help="Checked assets written to the database in one transaction. (Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--detail-budget",
+        type=int,
+        default=0,
+        help="Detailed scan checks at most this many assets, the most valuable first. "
+             "(Default is %(default)s, only marked assets)",
+    )
+    parser.add_argument(
+        "--detail-minutes",
+        type=float,
+        default=0,
+        help="Detailed scan takes no new asset after this many minutes. "
+             "(Default is %(default)s, only marked assets)",
+    )
+    add_scan_arguments(parser)
     args = parser.parse_args()
+    try:
+        apply_scan_arguments(args)
+    except ValueError as _e:
+        parser.error(str(_e))
 
     # if not path.exists(args.chrome_driver):
     #     console.print("Chromedriver file not found at " + args.chrome_driver + " !!!")
     #     input("Press Enter to exit...")
     #     sys.exit(0)
 
-    database = CommonDatabaseAccess(db_path=args.database, force=True)
+    database = CommonDatabaseAccess(
+        db_path=args.database, force=True, wal=args.wal, profile=args.profile
+    )
+    report_database = CommonDatabaseAccess(
+        db_path=args.database, force=False, profile=args.profile, read_only=True
+    )
 
     menu_title = " Select action"
     menu_items = [
@@ -627,6 +1253,10 @@ def main():
 
     local_path = os.path.dirname(sys.argv[0])
     global_data["local_path"] = local_path
+    global_data["workers"] = max(1, args.workers)
+    global_data["detail_budget"] = max(0, args.detail_budget)
+    global_data["detail_minutes"] = max(0, args.detail_minutes)
+    global_data["write_batch_size"] = max(1, args.write_batch_size)
 
     menu_exit = False
     while not menu_exit:
@@ -646,9 +1276,15 @@ def main():
             elif menu_sel == 3:  # Detailed scan
                 detailed_scan(database)
             elif menu_sel == 4:  # Check asset count
-                check_asset_count(database)
+                check_asset_count(report_database)
             elif menu_sel == 5:  # Quit
+                close_shared_driver()
                 menu_exit = True
+            if 1 <= menu_sel < 5:
+                for db in (database, report_database):
+                    db.write_profile(
+                        local_path + os.sep + "Profile.jsonl", menu_items[menu_sel - 1]
+                    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,366 @@
+"""
+Unattended update of the local asset library from https://substance3d.adobe.com/assets/allassets
+Asset scan, detailed scan, image download and folder icons run as one pipeline.
+Every stage runs in its own thread and passes new and changed assets to the next stage
+through a bounded queue, so an asset is downloaded while the next one is still checked
+and nothing waits for Enter.
+Database is opened in WAL mode, so the stages can read and write it at the same time
+"""
+import os
+import sys
+import queue
+import datetime
+import argparse
+import threading
+
+from rich import pretty
+from rich.console import Console
+from rich.traceback import install
+
+from requests.exceptions import RequestException
+
+from common_database_access import CommonDatabaseAccess
+from substance_assets_browser import (
+    start_browser,
+    get_driver_path,
+    close_shared_driver,
+)
+from substance_assets_changeset import record_asset_changes
+from substance_assets_page_scraper import (
+    global_data as scraper_data,
+    add_scan_arguments,
+    apply_scan_arguments,
+    asset_scan_by_asset_type,
+    read_asset_details_or_fail,
+    read_asset_details_from_snapshot,
+    write_detail_batch,
+)
+from substance_assets_image_downloader import (
+    global_data as downloader_data,
+    asset_path,
+    category_path,
+    download_asset_images,
+    make_asset_icon,
+)
+
+console = Console()
+pretty.install()
+install()  # this is for tracing project activity
+global_data = {"version": "Beta 1 (19.10.2026)\n"}
+
+# kinds of the changeset, that bring new art, see build_changeset
+PIPELINE_KINDS = ("new", "updated", "moved")
+
+
+def queue_items(tasks, state, stop):
+    """
+    Yields items from the queue until None. After stop is set the items are only taken,
+    so the stage before never blocks on the full queue
+    :param queue.Queue tasks: items from the stage before
+    :param {} state: "done" is set, when None was taken
+    :param threading.Event stop: set when the pipeline is interrupted
+    """
+    while True:
+        item = tasks.get()
+        if item is None:
+            state["done"] = True
+            return
+        if not stop.is_set():
+            yield item
+
+
+def run_stage(name, stage, args, tasks, results, summary, stop):
+    """
+    Thread target of one pipeline stage. Stage is called as stage(*args, items, emit, fail),
+    it takes items from the stage before and emits them to the next stage,
+    asset, that the stage could not process, is passed to fail with the error text.
+    None is put into results when the stage is finished, also after failure
+    :param str name: name of the stage in the summary
+    :param stage: stage function
+    :param () args: first arguments of the stage function
+    :param queue.Queue tasks: items from the stage before
+    :param queue.Queue results: items for the next stage, None for the last stage
+    :param {} summary: see run_pipeline
+    :param threading.Event stop: set when the pipeline is interrupted
+    """
+    state = {"done": False}
+
+    def emit(item):
+        summary[name] = summary[name] + 1
+        if results is not None:
+            results.put(item)
+
+    def fail(asset, error):
+        console.print(error)
+        summary["failed_assets"].append(f"{name} - {asset['name']}")
+
+    try:
+        stage(*args, queue_items(tasks, state, stop), emit, fail)
+    except Exception:  # stage failure must not stop the other stages
+        summary["failed"].append(name)
+        console.print_exception()
+        # queue is drained, so the stage before never blocks on the full queue
+        if not state["done"]:
+            for _ in queue_items(tasks, state, stop):
+                pass
+    finally:
+        if results is not None:
+            results.put(None)
+
+
+def scan_stage(database, categories, results):
+    """
+    Asset scan of the categories, new, updated and moved assets are passed on
+    :param CommonDatabaseAccess database: reference to the database
+    :param [] categories: categories to scan
+    :param queue.Queue results: {"id", "previous_category"} for the detail stage
+    :return: amount of passed assets
+    """
+    count = 0
+    try:
+        changeset = asset_scan_by_asset_type(
+            database,
+            global_data["debug"],
+            categories,
+            incremental=global_data["incremental"],
+            pause=False,
+        )
+        for kind in PIPELINE_KINDS:
+            for entry in changeset[kind]:
+                results.put(
+                    {
+                        "id": entry["asset"]["id"],
+                        "previous_category": entry.get("previous_category"),
+                    }
+                )
+                count = count + 1
+    finally:
+        close_shared_driver()
+        results.put(None)
+    return count
+
+
+def detail_stage(database, items, emit, fail):
+    """
+    Reads details and variant images of every asset from its page and writes them.
+    Asset is passed on also when its page was not loaded, its preview is still downloaded.
+    Scan of the details is created with the first asset, that is after the asset scan
+    was applied, so its change events come after the events of the asset scan
+    """
+    input_value = None
+    driver = None
+    try:
+        for item in items:
+            utc_timestamp = datetime.datetime.utcnow()
+            if input_value is None:
+                input_value = {"scan_id": database.set_new_scan(utc_timestamp), "changes": []}
+            input_value["utc_timestamp"] = utc_timestamp
+            asset = database.get_asset_by_id(item["id"])[0]
+            if scraper_data["replay"]:
+                loaded = read_asset_details_from_snapshot(
+                    scraper_data["snapshot_dir"], asset, utc_timestamp
+                )
+            else:
+                if driver is None:
+                    driver = start_browser(
+                        not scraper_data["show_browser"], get_driver_path()
+                    )
+                loaded = read_asset_details_or_fail(driver, asset, utc_timestamp)
+            if loaded:
+                record_asset_changes(input_value, asset)
+                write_detail_batch(database, input_value, [asset])
+            elif scraper_data["replay"]:
+                fail(asset, f"No snapshot of {asset['name']} page")
+            else:
+                fail(asset, f"Page of {asset['name']} was not loaded in time")
+            emit(item)
+        if input_value is not None:
+            database.set_scan_finished(input_value["scan_id"], datetime.datetime.utcnow())
+    finally:
+        if driver is not None:
+            driver.quit()
+
+
+def download_stage(database, items, emit, fail):
+    """
+    Downloads images of every asset into its folder. Only categories,
+    that have their folder, are downloaded, same as Download all images.
+    Folder of the moved asset is moved from its previous category, if it is there
+    """
+    for item in items:
+        assets = list(database.get_assets_with_path(asset_id=item["id"]))
+        if len(assets) == 0:
+            continue
+        asset = assets[0]
+        if not os.path.exists(category_path(asset["asset_type_name"], asset["category_name"])):
+            continue
+        try:
+            if (
+                    item["previous_category"] not in (None, asset["category"])
+                    and not os.path.exists(asset_path(asset))
+            ):
+                previous_path = (
+                    category_path(
+                        *database.get_asset_type_and_category_name_by_category_id(
+                            item["previous_category"]
+                        )
+                    )
+                    + os.sep
+                    + asset["name"]
+                )
+                if os.path.exists(previous_path):
+                    os.rename(previous_path, asset_path(asset))
+            if not os.path.exists(asset_path(asset)):
+                os.makedirs(asset_path(asset))
+            download_asset_images(database, asset)
+        except (RequestException, OSError) as _e:
+            fail(asset, f"Images of {asset['name']} were not downloaded: {_e}")
+            continue
+        item["asset"] = asset
+        emit(item)
+
+
+def icon_stage(items, emit, fail):
+    """Creates folder icon of every downloaded asset from its new preview"""
+    for item in items:
+        try:
+            make_asset_icon(item["asset"], True)
+        except OSError as _e:
+            fail(item["asset"], f"Icon of {item['asset']['name']} was not created: {_e}")
+            continue
+        emit(item)
+
+
+def run_pipeline(database, categories, queue_size):
+    """
+    Runs all stages at once, asset scan runs in this thread.
+    Queues between the stages hold at most queue_size assets,
+    so a fast stage waits for a slow one instead of piling up the work.
+    On Ctrl-C every stage ends after its current asset, queued assets are dropped,
+    all stages are joined and KeyboardInterrupt is raised again
+    :param CommonDatabaseAccess database: reference to the database
+    :param [] categories: categories to scan
+    :param int queue_size: assets waiting between two stages
+    :return: {stage name: amount of passed assets, "failed": [stage names],
+        "failed_assets": ["stage name - asset name"]}
+    """
+    summary = {
+        "scan": 0,
+        "details": 0,
+        "download": 0,
+        "icons": 0,
+        "failed": [],
+        "failed_assets": [],
+    }
+    stop = threading.Event()
+    detail_tasks = queue.Queue(queue_size)
+    download_tasks = queue.Queue(queue_size)
+    icon_tasks = queue.Queue(queue_size)
+    threads = [
+        threading.Thread(
+            target=run_stage,
+            args=(name, stage, args, tasks, results, summary, stop),
+            daemon=True,
+        )
+        for name, stage, args, tasks, results in (
+            ("details", detail_stage, (database,), detail_tasks, download_tasks),
+            ("download", download_stage, (database,), download_tasks, icon_tasks),
+            ("icons", icon_stage, (), icon_tasks, None),
+        )
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        summary["scan"] = scan_stage(database, categories, detail_tasks)
+    except Exception:  # stage failure must not stop the other stages
+        summary["failed"].append("scan")
+        console.print_exception()
+    except KeyboardInterrupt:
+        # scan stage has sent its None already, the others end after their current asset
+        stop.set()
+        for thread in threads:
+            thread.join()
+        raise
+    for thread in threads:
+        thread.join()
+    return summary
+
+
+def main():
+    """Command line entry for the unattended update"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-d",
+        "--database",
+        default="all_assets.db",
+        help="Path to the SQLite file. (Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--asset-type",
+        default="",
+        help="Scan only categories of this asset type. (Default is all asset types)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Scan only new and updated assets, categories are loaded newest first.",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=32,
+        help="Assets waiting between two stages. (Default is %(default)s)",
+    )
+    parser.add_argument(
+        "--debug", action="store_true", help="Display extra information while working."
+    )
+    add_scan_arguments(parser)
+    args = parser.parse_args()
+    try:
+        apply_scan_arguments(args)
+    except ValueError as _e:
+        parser.error(str(_e))
+
+    local_path = os.path.dirname(sys.argv[0])
+    global_data["debug"] = args.debug
+    global_data["incremental"] = args.incremental
+    downloader_data["local_path"] = local_path
+    scraper_data["local_path"] = local_path
+
+    console.print("version " + global_data["version"])
+    database = CommonDatabaseAccess(db_path=args.database, force=False, wal=True)
+    if args.asset_type:
+        asset_types = database.get_asset_type_by_name(args.asset_type)
+        if len(asset_types) == 0:
+            console.print(f"Asset type {args.asset_type} not found")
+            sys.exit(1)
+        categories = database.get_all_categories_by_asset_type_id(asset_types[0]["id"])
+    else:
+        categories = database.get_all_categories()
+    if len(categories) == 0:
+        console.print("No categories, run Initial Asset Type and Category scan first")
+        sys.exit(1)
+
+    try:
+        summary = run_pipeline(database, categories, max(1, args.queue_size))
+    except KeyboardInterrupt:
+        console.print("Interrupted, all stages were stopped")
+        sys.exit(1)
+    console.print()
+    console.print("Scanned assets - " + str(summary["scan"]))
+    console.print("Checked assets - " + str(summary["details"]))
+    console.print("Downloaded assets - " + str(summary["download"]))
+    console.print("Icons - " + str(summary["icons"]))
+    if len(summary["failed_assets"]) > 0:
+        console.print("Failed assets - " + str(len(summary["failed_assets"])))
+        for failed_asset in summary["failed_assets"]:
+            console.print(failed_asset)
+    if len(summary["failed"]) > 0:
+        console.print("Failed stages - " + ", ".join(summary["failed"]))
+    if len(summary["failed"]) > 0 or len(summary["failed_assets"]) > 0:
+        sys.exit(1)
+    console.print("All Done !!!")
+
+
+if __name__ == "__main__":
+    main()
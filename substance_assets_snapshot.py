@@ -0,0 +1,281 @@
+"""
+Snapshots of the scraped pages of https://substance3d.adobe.com/assets/allassets
+Every category and asset page is stored as gzipped HTML, one file per url,
+so the pages can be parsed again later without network and browser.
+lxml is used for parsing when it is installed, its tree is queried by XPath directly,
+otherwise the page is parsed into PageNode tree by the HTML parser of the standard library.
+Parsed data has the same form, as the data read by the scripts in the browser
+"""
+import os
+import gzip
+import hashlib
+
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+try:
+    import lxml.html
+except ImportError:  # without lxml pages are parsed by html.parser
+    lxml = None
+
+# elements without closing tag
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+# elements, that start new line of the text, same as innerText of the browser
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "section", "table", "tr", "ul",
+}
+# elements, that have no visible text
+HIDDEN_TAGS = {"script", "style", "noscript", "template", "head"}
+
+
+class PageNode:
+    """Element of the parsed page, children are PageNode or text"""
+
+    __slots__ = ("tag", "attrs", "children")
+
+    def __init__(self, tag, attrs):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+
+    def get(self, name, default=""):
+        """Attribute value"""
+        return self.attrs.get(name, default)
+
+    def iter(self, tag):
+        """All descendants with the tag in the document order"""
+        for child in self.children:
+            if isinstance(child, PageNode):
+                if child.tag == tag:
+                    yield child
+                yield from child.iter(tag)
+
+    def find(self, tag):
+        """First descendant with the tag, or None"""
+        return next(self.iter(tag), None)
+
+    def text_lines(self) -> []:
+        """Visible text by lines, same as innerText split by lines in the browser"""
+        parts = []
+        self._collect_text(parts)
+        return _join_text_lines(parts)
+
+    def _collect_text(self, parts) -> None:
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child.replace("\n", " "))
+            elif child.tag not in HIDDEN_TAGS:
+                if child.tag in BLOCK_TAGS:
+                    parts.append("\n")
+                child._collect_text(parts)
+                if child.tag in BLOCK_TAGS:
+                    parts.append("\n")
+
+
+class _PageTreeBuilder(HTMLParser):
+    """Builds PageNode tree with html.parser"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = PageNode("document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = PageNode(tag, {name: value or "" for name, value in attrs})
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1].children.append(
+            PageNode(tag, {name: value or "" for name, value in attrs})
+        )
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                break
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def _join_text_lines(parts) -> []:
+    """Not empty lines of the collected text with collapsed whitespace"""
+    return [" ".join(line.split()) for line in "".join(parts).split("\n") if line.strip()]
+
+
+def _lxml_collect_text(element, parts) -> None:
+    """Same as PageNode._collect_text for lxml element"""
+    if element.text:
+        parts.append(element.text.replace("\n", " "))
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in HIDDEN_TAGS:
+            if child.tag in BLOCK_TAGS:
+                parts.append("\n")
+            _lxml_collect_text(child, parts)
+            if child.tag in BLOCK_TAGS:
+                parts.append("\n")
+        if child.tail:
+            parts.append(child.tail.replace("\n", " "))
+
+
+def _lxml_text_lines(element) -> []:
+    """Visible text of lxml element by lines, see PageNode.text_lines"""
+    parts = []
+    _lxml_collect_text(element, parts)
+    return _join_text_lines(parts)
+
+
+def parse_page(html) -> PageNode:
+    """
+    Parses page source with html.parser
+    :param str html: page source
+    :return: root of the page
+    """
+    builder = _PageTreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def snapshot_file(snapshot_dir, kind, url) -> str:
+    """
+    Path to the snapshot of the page
+    :param str snapshot_dir: folder with snapshots
+    :param str kind: "category", "category_newest" or "asset"
+    :param str url: url of the page
+    """
+    return (
+        snapshot_dir
+        + os.sep
+        + kind
+        + os.sep
+        + hashlib.sha1(url.encode("utf-8")).hexdigest()
+        + ".html.gz"
+    )
+
+
+def save_snapshot(snapshot_dir, kind, url, page_source) -> None:
+    """Stores page source gzipped, previous snapshot of the url is replaced"""
+    file_path = snapshot_file(snapshot_dir, kind, url)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with gzip.open(file_path + ".tmp", "wt", encoding="utf-8") as file:
+        file.write(page_source)
+    os.replace(file_path + ".tmp", file_path)
+
+
+def load_snapshot(snapshot_dir, kind, url):
+    """
+    Reads stored page source
+    :return: page source, or None if there is no snapshot of the url
+    """
+    file_path = snapshot_file(snapshot_dir, kind, url)
+    if not os.path.exists(file_path):
+        return None
+    with gzip.open(file_path, "rt", encoding="utf-8") as file:
+        return file.read()
+
+
+def read_category_cards(html, page_url, asset_class="") -> {}:
+    """
+    Reads asset cards from category page, same as CARD_DATA_SCRIPT in the browser
+    :param str html: page source
+    :param str page_url: url of the page, relative links are resolved against it
+    :param str asset_class: class of the cards, found from the first "source-asset-thumbnail" div if empty
+    :return: {"assetClass", "cards": [{"href", "img", "text"}]}
+    """
+    if lxml is not None:
+        return _read_category_cards_lxml(html, page_url, asset_class)
+    cards = []
+    for div in parse_page(html).iter("div"):
+        class_name = div.get("class")
+        if asset_class == "" and "source-asset-thumbnail" in class_name:
+            asset_class = class_name
+        if asset_class == "" or class_name != asset_class:
+            continue
+        link = div.find("a")
+        img = div.find("img")
+        if link is None or img is None:
+            continue
+        cards.append(
+            {
+                "href": urljoin(page_url, link.get("href")),
+                "img": urljoin(page_url, img.get("src")),
+                "text": div.text_lines(),
+            }
+        )
+    return {"assetClass": asset_class, "cards": cards}
+
+
+def read_gallery_images(html, page_url, view_class):
+    """
+    Reads gallery images from asset page, same as GALLERY_DATA_SCRIPT in the browser
+    :param str html: page source
+    :param str page_url: url of the page, relative links are resolved against it
+    :param str view_class: class of the gallery div
+    :return: [{"src", "className"}], or None if there is no gallery
+    """
+    if lxml is not None:
+        return _read_gallery_images_lxml(html, page_url, view_class)
+    view = next(
+        (div for div in parse_page(html).iter("div") if div.get("class") == view_class),
+        None,
+    )
+    if view is None:
+        return None
+    images = []
+    for div in view.iter("div"):
+        img = div.find("img")
+        if img is not None:
+            images.append(
+                {"src": urljoin(page_url, img.get("src")), "className": div.get("class")}
+            )
+    return images
+
+
+def _read_category_cards_lxml(html, page_url, asset_class) -> {}:
+    """read_category_cards with lxml, cards are selected by XPath without copying the page"""
+    document = lxml.html.document_fromstring(html)
+    if asset_class == "":
+        first = document.xpath("(//div[contains(@class, 'source-asset-thumbnail')])[1]")
+        if len(first) == 0:
+            return {"assetClass": "", "cards": []}
+        asset_class = first[0].get("class")
+    cards = []
+    for div in document.xpath("//div[@class = $name]", name=asset_class):
+        link = div.xpath("(.//a)[1]")
+        img = div.xpath("(.//img)[1]")
+        if len(link) == 0 or len(img) == 0:
+            continue
+        cards.append(
+            {
+                "href": urljoin(page_url, link[0].get("href", "")),
+                "img": urljoin(page_url, img[0].get("src", "")),
+                "text": _lxml_text_lines(div),
+            }
+        )
+    return {"assetClass": asset_class, "cards": cards}
+
+
+def _read_gallery_images_lxml(html, page_url, view_class):
+    """read_gallery_images with lxml, gallery is selected by XPath without copying the page"""
+    view = lxml.html.document_fromstring(html).xpath(
+        "(//div[@class = $name])[1]", name=view_class
+    )
+    if len(view) == 0:
+        return None
+    images = []
+    for div in view[0].xpath(".//div"):
+        img = div.xpath("(.//img)[1]")
+        if len(img) > 0:
+            images.append(
+                {"src": urljoin(page_url, img[0].get("src", "")), "className": div.get("class", "")}
+            )
+    return images
@@ -0,0 +1,62 @@
+"""Scripts of the project are flat modules in the project folder"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common_database_access import CommonDatabaseAccess  # noqa: E402
+
+
+def asset_data(name, category, **columns) -> {}:
+    """Data of the new asset, url and preview are made from the name"""
+    data = {
+        "name": name,
+        "url": "https://substance3d.adobe.com/assets/allassets/" + name.lower(),
+        "category": category,
+        "preview_image": f"https://cdn.substance3d.com/{name.lower()}.png",
+        "details_image": "",
+        "variant_1_image": "",
+        "variant_2_image": "",
+        "variant_3_image": "",
+        "have_preview_image_changed": False,
+        "have_details_image_changed": False,
+        "have_variant_1_image_changed": False,
+        "have_variant_2_image_changed": False,
+        "have_variant_3_image_changed": False,
+        "last_change_date": None,
+        "need_to_check": False,
+        "format_sbsar": True,
+        "format_sbs": False,
+        "format_exr": False,
+        "format_fbx": False,
+        "format_glb": False,
+        "format_mdl": False,
+        "have_format_sbsar": False,
+        "have_format_sbs": False,
+        "have_format_exr": False,
+        "have_format_fbx": False,
+        "have_format_glb": False,
+        "have_format_mdl": False,
+    }
+    data.update(columns)
+    return data
+
+
+@pytest.fixture
+def database(tmp_path):
+    """New empty catalog"""
+    database = CommonDatabaseAccess(db_path=str(tmp_path / "assets.db"), force=True)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def add_asset():
+    """Adds asset to the catalog, see asset_data, and returns its id"""
+
+    def add(database, name, category, **columns):
+        return database.set_new_asset(asset_data(name, category, **columns))
+
+    return add
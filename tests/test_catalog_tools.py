@@ -0,0 +1,154 @@
+"""Export, import and merge of the catalog files, see substance_assets_catalog_tools.py"""
+import datetime
+import hashlib
+import sqlite3
+
+import pytest
+
+from common_database_access import CATALOG_TABLES, CommonDatabaseAccess, format_mask
+from substance_assets_catalog_tools import export_catalog, import_catalog, pyarrow
+
+NOW = datetime.datetime(2026, 10, 19, 12, 0)
+
+# asset table of the catalog files made before formats_offered, formats_owned,
+# name_key and removed columns were added
+LEGACY_SCHEMA = """
+CREATE TABLE asset_type (id integer PRIMARY KEY, name text NOT NULL, url text NOT NULL);
+CREATE TABLE category (id integer PRIMARY KEY, asset_type integer NOT NULL,
+ name text NOT NULL, url text NOT NULL);
+CREATE TABLE asset (id integer PRIMARY KEY, category integer NOT NULL, name text NOT NULL,
+ url text NOT NULL, preview_image text NOT NULL, details_image text, variant_1_image text,
+ variant_2_image text, variant_3_image text, have_preview_image_changed bool,
+ have_details_image_changed bool, have_variant_1_image_changed bool,
+ have_variant_2_image_changed bool, have_variant_3_image_changed bool,
+ last_change_date timestamp, need_to_check bool, format_sbsar bool, format_sbs bool,
+ format_exr bool, format_fbx bool, format_glb bool, format_mdl bool, have_format_sbsar bool,
+ have_format_sbs bool, have_format_exr bool, have_format_fbx bool, have_format_glb bool,
+ have_format_mdl bool);
+"""
+
+
+def file_hash(file_path):
+    with open(file_path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def table_rows(database):
+    return {
+        table: [row for batch in database.get_table_batches(table, 2) for row in batch]
+        for table in CATALOG_TABLES
+    }
+
+
+def new_catalog(tmp_path, name):
+    return CommonDatabaseAccess(db_path=str(tmp_path / name), force=True)
+
+
+@pytest.fixture
+def filled(database, add_asset):
+    """Catalog with every table filled"""
+    asset_type = database.set_new_asset_type("Materials", "https://x/materials")
+    wood = database.set_new_category("Wood", "https://x/wood", asset_type)
+    database.set_new_category("Stone", "https://x/stone", asset_type)
+    oak = add_asset(database, "Oak", wood, last_change_date=NOW, format_exr=True)
+    add_asset(database, "Pine", wood, have_format_sbsar=True, removed=True)
+    scan_id = database.set_new_scan(NOW)
+    database.set_new_asset_changes(
+        [
+            {
+                "scan": scan_id,
+                "asset": oak,
+                "field": "preview_image",
+                "old_value": None,
+                "new_value": "https://cdn.substance3d.com/oak.png",
+                "change_date": NOW,
+            }
+        ]
+    )
+    database.set_scan_categories(scan_id, [wood])
+    database.set_scan_category_state(scan_id, wood, "done", NOW)
+    database.set_new_scan_report_entries(scan_id, "new_elements_count", ["Wood -- Oak"])
+    database.set_scan_finished(scan_id, NOW)
+    return database
+
+
+@pytest.mark.parametrize("file_format", ["jsonl", "parquet"])
+def test_export_and_import_keep_all_rows(filled, tmp_path, file_format):
+    if file_format == "parquet" and pyarrow is None:
+        pytest.skip("pyarrow is not installed")
+    export_catalog(filled, str(tmp_path / "export"), file_format, batch_size=1)
+    copy = new_catalog(tmp_path, "copy.db")
+    import_catalog(copy, str(tmp_path / "export"), batch_size=1)
+    assert table_rows(copy) == table_rows(filled)
+    copy.close()
+
+
+def test_merge_adds_only_missing_rows_and_keeps_the_other_file(database, add_asset, tmp_path):
+    asset_type = database.set_new_asset_type("Materials", "https://x/materials")
+    wood = database.set_new_category("Wood", "https://x/wood", asset_type)
+    add_asset(database, "Oak", wood)
+
+    shard = new_catalog(tmp_path, "shard.db")
+    shard_type = shard.set_new_asset_type("Models", "https://x/models")
+    cars = shard.set_new_category("Cars", "https://x/cars", shard_type)
+    shard_materials = shard.set_new_asset_type("Materials", "https://x/materials")
+    shard_wood = shard.set_new_category("Wood", "https://x/wood", shard_materials)
+    add_asset(shard, "Oak", shard_wood, preview_image="https://cdn.substance3d.com/other.png")
+    add_asset(shard, "Pine", shard_wood, format_mdl=True)
+    add_asset(shard, "Truck", cars)
+    add_asset(shard, "Truck", cars, preview_image="https://cdn.substance3d.com/second.png")
+    shard.close()
+    before = file_hash(tmp_path / "shard.db")
+
+    result = database.merge_database(str(tmp_path / "shard.db"))
+
+    assert result == {"asset_types": 1, "categories": 1, "assets": 2}
+    assert file_hash(tmp_path / "shard.db") == before
+    assets = {asset["name"]: asset for asset in database.get_all_assets()}
+    assert sorted(assets) == ["Oak", "Pine", "Truck"]
+    assert assets["Oak"]["preview_image"] == "https://cdn.substance3d.com/oak.png"
+    assert assets["Pine"]["category"] == wood
+    assert assets["Pine"]["formats_offered"] == format_mask(assets["Pine"], "format_")
+    truck_category = database.get_all_categories_by_id(assets["Truck"]["category"])[0]
+    assert truck_category["name"] == "Cars"
+    assert assets["Truck"]["preview_image"] == "https://cdn.substance3d.com/truck.png"
+
+
+def test_merge_reads_catalog_of_older_version(database, tmp_path):
+    legacy = sqlite3.connect(tmp_path / "legacy.db")
+    legacy.executescript(LEGACY_SCHEMA)
+    legacy.execute("INSERT INTO asset_type VALUES (1, 'Materials', 'https://x/materials')")
+    legacy.execute("INSERT INTO category VALUES (1, 1, 'Wood', 'https://x/wood')")
+    legacy.execute(
+        """INSERT INTO asset VALUES (1, 1, 'Oak', 'https://x/oak', 'https://x/oak.png',
+         '', '', '', '', 0, 0, 0, 0, 0, NULL, 1, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0)"""
+    )
+    legacy.commit()
+    legacy.close()
+    before = file_hash(tmp_path / "legacy.db")
+
+    assert database.merge_database(str(tmp_path / "legacy.db"))["assets"] == 1
+
+    assert file_hash(tmp_path / "legacy.db") == before
+    oak = database.get_all_assets()[0]
+    assert oak["formats_offered"] == format_mask(oak, "format_")
+    assert oak["formats_owned"] == format_mask(oak, "have_format_")
+    assert oak["format_exr"] and oak["have_format_sbsar"]
+    assert not oak["removed"]
+
+
+def test_report_counts_assets_across_catalogs_once_per_url(filled, add_asset, tmp_path):
+    shard = new_catalog(tmp_path, "shard.db")
+    shard_type = shard.set_new_asset_type("Materials", "https://x/materials")
+    shard_wood = shard.set_new_category("Wood", "https://x/wood", shard_type)
+    add_asset(shard, "Oak", shard_wood)
+    add_asset(shard, "Birch", shard_wood)
+    shard.close()
+
+    filled.attach_database(str(tmp_path / "shard.db"), "shard0", read_only=True)
+    try:
+        report = filled.prepare_asset_type_and_category_dictionary(("shard0",))
+    finally:
+        filled.detach_database("shard0")
+    # Pine is removed, Oak is in both catalogs
+    assert report == {"Materials": (2, {"Stone": 0, "Wood": 2})}
@@ -0,0 +1,247 @@
+"""Diff of the scanned cards with the catalog, see substance_assets_changeset.py"""
+import datetime
+
+import pytest
+
+from substance_assets_changeset import (
+    apply_changeset,
+    build_changeset,
+    changeset_report,
+    load_known_assets,
+)
+
+NOW = datetime.datetime(2026, 10, 19, 12, 0)
+
+
+def card(name, image=None, need_update=False, formats=("SBSAR",)):
+    """Card of the asset as the category scan reads it, see card_from_title_text"""
+    return {
+        "href": "https://substance3d.adobe.com/assets/allassets/" + name.lower(),
+        "image": image or f"https://cdn.substance3d.com/{name.lower()}.png",
+        "name": name,
+        "formats": list(formats),
+        "need_update": need_update,
+    }
+
+
+@pytest.fixture
+def catalog(database, add_asset):
+    """Wood with four assets, Stone with two, Metal with one"""
+    asset_type = database.set_new_asset_type("Materials", "https://x/materials")
+    categories = {}
+    for name in ("Wood", "Stone", "Metal"):
+        category_id = database.set_new_category(name, "https://x/" + name, asset_type)
+        categories[name] = database.get_all_categories_by_id(category_id)[0]
+    for name in ("Oak", "Pine", "Birch", "Maple"):
+        add_asset(database, name, categories["Wood"]["id"])
+    for name in ("Granite", "Marble"):
+        add_asset(database, name, categories["Stone"]["id"])
+    add_asset(database, "Steel", categories["Metal"]["id"])
+    return categories
+
+
+def scan_state(database):
+    input_value = {
+        "scan_id": database.set_new_scan(NOW),
+        "utc_timestamp": NOW,
+        "changes": [],
+    }
+    load_known_assets(input_value, database)
+    return input_value
+
+
+def names(entries):
+    return [(entry["card"] or entry["asset"])["name"] for entry in entries]
+
+
+def all_category_ids(catalog):
+    return {cat["id"] for cat in catalog.values()}
+
+
+def full_scan(catalog, wood=None, stone=None, metal=None):
+    """[(category, cards)] of all categories, unchanged cards by default"""
+    if wood is None:
+        wood = [card(name) for name in ("Oak", "Pine", "Birch", "Maple")]
+    if stone is None:
+        stone = [card("Granite"), card("Marble")]
+    if metal is None:
+        metal = [card("Steel")]
+    return [(catalog["Wood"], wood), (catalog["Stone"], stone), (catalog["Metal"], metal)]
+
+
+def test_unchanged_scan_has_no_changes(database, catalog):
+    changeset = build_changeset(
+        scan_state(database), full_scan(catalog), all_category_ids(catalog)
+    )
+    assert all(len(changeset[kind]) == 0 for kind in changeset)
+
+
+def test_cards_are_classified(database, catalog):
+    wood = [
+        card("Oak", image="https://cdn.substance3d.com/oak-v2.png"),
+        card("Pine", need_update=True),
+        card("Birch", formats=("SBSAR", "EXR")),
+        card("Maple"),
+        card("Walnut"),
+    ]
+    metal = [card("Steel"), card("Granite")]
+    changeset = build_changeset(
+        scan_state(database),
+        full_scan(catalog, wood=wood, stone=[card("Marble")], metal=metal),
+        all_category_ids(catalog),
+    )
+    assert names(changeset["new"]) == ["Walnut"]
+    assert names(changeset["updated"]) == ["Oak", "Pine"]
+    assert names(changeset["refreshed"]) == ["Birch"]
+    assert names(changeset["moved"]) == ["Granite"]
+    assert changeset["moved"][0]["category"] == catalog["Metal"]
+    assert changeset["removed"] == []
+
+
+def test_first_card_wins(database, catalog):
+    wood = [card(name) for name in ("Oak", "Pine", "Birch", "Maple", "Walnut", "Walnut")]
+    stone = [
+        card("Granite"),
+        card("Marble"),
+        card("Oak", image="https://cdn.substance3d.com/oak-v2.png"),
+    ]
+    changeset = build_changeset(
+        scan_state(database),
+        full_scan(catalog, wood=wood, stone=stone),
+        all_category_ids(catalog),
+    )
+    assert names(changeset["new"]) == ["Walnut"]
+    assert changeset["moved"] == []
+    assert changeset["updated"] == []
+
+
+def test_placeholder_preview_keeps_the_asset(database, catalog):
+    wood = [
+        card("Oak", image="data:image/gif;base64,R0lGOD"),
+        card("Pine"),
+        card("Birch"),
+        card("Maple"),
+        card("Walnut", image="data:image/gif;base64,R0lGOD"),
+    ]
+    changeset = build_changeset(
+        scan_state(database), full_scan(catalog, wood=wood), all_category_ids(catalog)
+    )
+    assert all(len(changeset[kind]) == 0 for kind in changeset)
+
+
+def test_missing_assets_are_removed_only_from_complete_categories(database, catalog):
+    stone = [card("Granite")]
+    wood = [card(name) for name in ("Oak", "Pine", "Birch")]
+    input_value = scan_state(database)
+    changeset = build_changeset(
+        input_value, full_scan(catalog, wood=wood, stone=stone), {catalog["Stone"]["id"]}
+    )
+    assert names(changeset["removed"]) == ["Marble"]
+    changeset = build_changeset(input_value, full_scan(catalog, wood=wood, stone=stone), set())
+    assert changeset["removed"] == []
+
+
+def test_removal_of_too_many_assets_is_skipped(database, catalog):
+    wood = [card("Oak"), card("Pine")]
+    changeset = build_changeset(
+        scan_state(database),
+        full_scan(catalog, wood=wood, stone=[card("Granite")]),
+        all_category_ids(catalog),
+        max_removed_share=0.25,
+    )
+    # one asset can be removed also above the share, two of four can not
+    assert names(changeset["removed"]) == ["Marble"]
+    assert changeset["removal_skipped"] == [
+        {"category": catalog["Wood"]["id"], "missing": 2, "known": 4}
+    ]
+    changeset = build_changeset(
+        scan_state(database),
+        full_scan(catalog, wood=wood),
+        all_category_ids(catalog),
+        max_removed_share=0.5,
+    )
+    assert names(changeset["removed"]) == ["Birch", "Maple"]
+
+
+def test_applied_cards_of_resumed_scan_are_only_found(database, catalog):
+    # Pine moved to Metal, Metal was applied before the resume
+    metal = [card("Steel"), card("Pine")]
+    wood = [card("Oak"), card("Birch"), card("Maple")]
+    changeset = build_changeset(
+        scan_state(database),
+        [(catalog["Wood"], wood), (catalog["Stone"], [card("Granite"), card("Marble")])],
+        all_category_ids(catalog),
+        applied_cards=[(catalog["Metal"], metal)],
+    )
+    assert all(len(changeset[kind]) == 0 for kind in changeset)
+
+
+def test_changeset_is_applied_with_change_events(database, catalog):
+    input_value = scan_state(database)
+    changeset = build_changeset(
+        input_value,
+        full_scan(
+            catalog,
+            wood=[card("Oak"), card("Pine"), card("Birch"), card("Walnut")],
+            stone=[card("Granite")],
+            metal=[card("Steel"), card("Marble")],
+        ),
+        all_category_ids(catalog),
+    )
+    report = changeset_report(changeset, input_value["category_names"])
+    with database.batch_write():
+        apply_changeset(database, input_value, changeset)
+
+    assets = {asset["name"]: asset for asset in database.get_all_assets()}
+    assert assets["Walnut"]["need_to_check"]
+    assert changeset["new"][0]["asset"]["id"] == assets["Walnut"]["id"]
+    assert assets["Marble"]["category"] == catalog["Metal"]["id"]
+    assert changeset["moved"][0]["previous_category"] == catalog["Stone"]["id"]
+    assert assets["Maple"]["removed"]
+    assert not assets["Oak"]["removed"]
+    assert report == {
+        "new_elements_count": ["Wood -- Walnut"],
+        "updated_elements_count": [],
+        "changed_category": ["Marble -- *From* Stone *To* Metal"],
+        "removed_elements": ["Wood -- Maple"],
+    }
+    events = {
+        (event["asset"], event["field"], event["old_value"], event["new_value"])
+        for event in database.get_asset_changes_since_scan(0)
+    }
+    assert (assets["Walnut"]["id"], "asset", None, "Walnut") in events
+    assert (
+        assets["Marble"]["id"], "category", catalog["Stone"]["id"], catalog["Metal"]["id"]
+    ) in events
+    assert (assets["Maple"]["id"], "removed", 0, 1) in events
+
+
+def test_removed_asset_comes_back_as_updated(database, catalog):
+    input_value = scan_state(database)
+    wood = [card("Oak"), card("Pine"), card("Birch")]
+    with database.batch_write():
+        apply_changeset(
+            database,
+            input_value,
+            build_changeset(input_value, full_scan(catalog, wood=wood), all_category_ids(catalog)),
+        )
+    input_value = scan_state(database)
+    changeset = build_changeset(input_value, full_scan(catalog), all_category_ids(catalog))
+    assert names(changeset["updated"]) == ["Maple"]
+    with database.batch_write():
+        apply_changeset(database, input_value, changeset)
+    maple = [asset for asset in database.get_all_assets() if asset["name"] == "Maple"][0]
+    assert not maple["removed"]
+
+
+def test_collected_cards_are_stored_per_scan(database, catalog):
+    scan_id = database.set_new_scan(NOW)
+    database.set_scan_categories(scan_id, all_category_ids(catalog))
+    cards = [card("Oak"), card("Walnut", need_update=True, formats=("SBSAR", "EXR"))]
+    database.set_scan_category_cards(scan_id, catalog["Wood"]["id"], cards)
+    database.set_scan_category_cards(scan_id, catalog["Metal"]["id"], [])
+    assert database.get_scan_category_cards(scan_id) == {catalog["Wood"]["id"]: cards}
+    database.set_scan_category_cards(scan_id, catalog["Wood"]["id"], cards[:1])
+    assert database.get_scan_category_cards(scan_id) == {catalog["Wood"]["id"]: cards[:1]}
+    database.delete_scan_category_cards(scan_id)
+    assert database.get_scan_category_cards(scan_id) == {}
@@ -0,0 +1,129 @@
+"""Paging and card mapping of the HTTP backend against the local stub"""
+import datetime
+import threading
+
+import pytest
+
+from requests.exceptions import RequestException
+
+from substance_assets_http_scanner import (
+    card_from_item,
+    category_filters,
+    create_session,
+    fetch_category_cards,
+)
+from substance_assets_http_stub import FIXTURE_DIR, create_stub_server, load_fixtures
+
+CATEGORY_URL = "https://substance3d.adobe.com/assets/allassets?assetType={}&category={}"
+WOOD_URL = CATEGORY_URL.format("substanceMaterial", "Wood")
+
+
+def serve(fixtures):
+    server = create_stub_server(fixtures)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/graphql"
+
+
+@pytest.fixture
+def stub():
+    server, endpoint = serve(load_fixtures(FIXTURE_DIR))
+    session = create_session()
+    yield server, endpoint, session
+    session.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_pages_are_read_until_the_last_one(stub):
+    server, endpoint, session = stub
+    cards = fetch_category_cards(session, endpoint, WOOD_URL, page_size=2)
+    assert [card["name"] for card in cards] == [
+        "Oak Planks",
+        "Walnut Veneer",
+        "Pine Bark",
+        "Birch Plywood",
+        "Charred Wood",
+    ]
+    assert [request["page"] for request in server.requests] == [0, 1, 2]
+    assert all(request["limit"] == 2 for request in server.requests)
+
+
+def test_full_last_page_needs_no_extra_request(stub):
+    server, endpoint, session = stub
+    cards = fetch_category_cards(session, endpoint, WOOD_URL, page_size=5)
+    assert len(cards) == 5
+    assert len(server.requests) == 1
+
+
+def test_category_filter_is_taken_from_the_category_url(stub):
+    server, endpoint, session = stub
+    fetch_category_cards(session, endpoint, CATEGORY_URL.format("substanceMaterial", "Stone"))
+    assert server.requests[0]["filters"] == {
+        "status": ["published"],
+        "type": "substanceMaterial",
+        "categories": ["Stone"],
+    }
+    assert category_filters("https://substance3d.adobe.com/assets/allassets") == {
+        "status": ["published"],
+        "type": "",
+        "categories": [],
+    }
+
+
+def test_card_uses_thumbnail_and_download_formats(stub):
+    _, endpoint, session = stub
+    cards = fetch_category_cards(session, endpoint, WOOD_URL)
+    assert cards[0] == {
+        "href": "https://substance3d.adobe.com/assets/allassets/oak-planks",
+        "image": "https://cdn.substance3d.com/v2/files/public/oak-planks_preview.png",
+        "name": "Oak Planks",
+        "formats": ["SBSAR", "SBS"],
+        "need_update": False,
+    }
+    assert cards[4]["formats"] == ["SBSAR", "SBS", "MDL"]
+
+
+def test_recently_updated_asset_needs_update():
+    item = next(
+        item
+        for fixture in load_fixtures(FIXTURE_DIR)
+        for item in fixture["items"]
+        if item["id"] == "pine-bark"
+    )
+    assert card_from_item(item, datetime.datetime(2026, 10, 19))["need_update"]
+    assert not card_from_item(item, datetime.datetime(2027, 1, 1))["need_update"]
+
+
+def test_item_without_preview_has_no_image():
+    card = card_from_item({"id": "bare", "title": "Bare", "attachments": []})
+    assert card["image"] == ""
+    assert not card["need_update"]
+
+
+def test_empty_and_unknown_categories_have_no_cards(stub):
+    server, endpoint, session = stub
+    for category_url in (
+        CATEGORY_URL.format("3d-model", "Vehicles"),
+        CATEGORY_URL.format("substanceMaterial", "Glass"),
+    ):
+        assert fetch_category_cards(session, endpoint, category_url) == []
+    assert len(server.requests) == 2
+
+
+def test_graphql_errors_are_raised():
+    server, endpoint = serve(
+        [
+            {
+                "filters": category_filters(WOOD_URL),
+                "errors": [{"message": "Too many requests"}],
+            }
+        ]
+    )
+    session = create_session()
+    try:
+        with pytest.raises(RequestException, match="Too many requests"):
+            fetch_category_cards(session, endpoint, WOOD_URL)
+    finally:
+        session.close()
+        server.shutdown()
+        server.server_close()